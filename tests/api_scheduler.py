@@ -0,0 +1,124 @@
+import json
+import random
+import socket
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+from src.lib.logging_config import logger
+
+# 상수 정의
+DAILY_QUOTA = 10000  # YouTube Data API 기본 일일 할당량 (단위)
+QUOTA_COSTS = {
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "videos.list": 1,
+    "search.list": 100,
+}
+REQUESTS_PER_SECOND = 5.0  # 토큰 버킷 충전 속도
+BURST = 10  # 토큰 버킷 최대 크기
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0  # 초
+BACKOFF_MAX = 64.0  # 초
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def error_reason(error):
+    try:
+        details = json.loads(error.content)["error"]["errors"]
+        return details[0].get("reason")
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
+# 모든 YouTube API 요청이 거쳐 가는 스케줄러
+# 메서드별 할당량을 일일 예산과 비교하고, 토큰 버킷으로 속도를 제한하며,
+# 일시적인 오류는 지터가 포함된 지수 백오프로 재시도합니다.
+class ApiScheduler:
+    def __init__(
+        self,
+        daily_budget=DAILY_QUOTA,
+        used=0,
+        bucket=None,
+        max_retries=MAX_RETRIES,
+    ):
+        self.daily_budget = daily_budget
+        self.used = used
+        self.bucket = bucket or TokenBucket()
+        self.max_retries = max_retries
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def method_name(request):
+        return getattr(request, "methodId", "").removeprefix("youtube.")
+
+    def _charge(self, method):
+        cost = QUOTA_COSTS.get(method, 1)
+        with self.lock:
+            if self.used + cost > self.daily_budget:
+                raise QuotaExceeded(
+                    f"일일 할당량 예산 초과: {self.used}/{self.daily_budget} ({method})"
+                )
+            self.used += cost
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+    def execute(self, request):
+        method = self.method_name(request)
+        attempt = 0
+        while True:
+            self._charge(method)
+            self.bucket.acquire()
+            try:
+                return request.execute()
+            except HttpError as e:
+                reason = error_reason(e)
+                if reason in QUOTA_REASONS:
+                    raise QuotaExceeded(f"YouTube API 할당량 초과 ({method})") from e
+                retryable = e.resp.status in RETRYABLE_STATUS or (
+                    e.resp.status == 403 and reason in RETRYABLE_REASONS
+                )
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                error = e
+            except (socket.timeout, ConnectionError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                error = e
+
+            delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt))
+            attempt += 1
+            logger.warning(
+                f"{method} 요청 실패 ({error}), {delay:.1f}초 후 재시도 "
+                f"({attempt}/{self.max_retries})"
+            )
+            time.sleep(delay)
@@ -0,0 +1,132 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+import numpy as np
+
+# 상수 정의
+SAMPLE_RATE = 16000  # Whisper 입력 샘플링 레이트
+# 음성 인식에 충분한 가장 작은 오디오 스트림 (32kbps 이상 중 비트레이트가 낮은 순)
+YTDLP_AUDIO_FORMAT = "bestaudio[abr>=32]/bestaudio"
+YTDLP_AUDIO_SORT = "+abr"
+CHUNK_SIZE = 64 * 1024
+
+
+def pcm_command(input_path, audio_filter=None, sample_rate=SAMPLE_RATE):
+    command = ["ffmpeg", "-nostdin", "-threads", "0", "-i", input_path, "-vn"]
+    if audio_filter:
+        command += ["-af", audio_filter]
+    command += ["-f", "f32le", "-ac", "1", "-ar", str(sample_rate), "-"]
+    return command
+
+
+# ffmpeg로 원본(비디오/오디오)을 바로 16kHz 모노 float32 PCM으로 디코딩
+# 필터(예: "highpass=f=200,lowpass=f=3000")는 같은 필터 그래프에서 적용되므로
+# 중간 MP3 인코딩/디코딩과 임시 파일이 필요 없습니다.
+def decode_audio(source_path, audio_filter=None, sample_rate=SAMPLE_RATE):
+    command = pcm_command(source_path, audio_filter, sample_rate)
+    result = subprocess.run(command, capture_output=True)
+    if result.returncode != 0:
+        stderr = result.stderr.decode(errors="ignore")
+        raise Exception(f"음성 디코딩 실패: {stderr[-500:]}")
+    return np.frombuffer(result.stdout, np.float32)
+
+
+# ffprobe로 디코딩 없이 길이(초)만 확인
+def probe_duration(source_path):
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "csv=p=0",
+            source_path,
+        ],
+        capture_output=True,
+        text=True,
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        raise Exception(f"길이를 확인할 수 없습니다: {source_path}")
+
+
+# yt-dlp 출력을 ffmpeg 입력으로 흘려보내면서 압축된 오디오 스트림을 cache_path에 저장
+def _tee_stream(source, sink, cache_file):
+    try:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            cache_file.write(chunk)
+            sink.write(chunk)
+    except BrokenPipeError:
+        pass
+    finally:
+        sink.close()
+
+
+# 유튜브 URL에서 오디오 스트림만 받아 비디오를 디스크에 쓰지 않고 바로 PCM으로 디코딩
+# 완료된 오디오는 cache_path에 남겨 두어 다음 실행에서는 다운로드를 건너뜁니다.
+def stream_youtube_audio(url, cache_path, audio_filter=None, sample_rate=SAMPLE_RATE):
+    if os.path.exists(cache_path):
+        return decode_audio(cache_path, audio_filter, sample_rate)
+
+    if not shutil.which("yt-dlp"):
+        raise Exception("yt-dlp를 찾을 수 없습니다.")
+
+    temp_path = cache_path + ".part"
+    with tempfile.TemporaryFile() as downloader_log:
+        with tempfile.TemporaryFile() as decoder_log:
+            downloader = subprocess.Popen(
+                [
+                    "yt-dlp",
+                    "-f",
+                    YTDLP_AUDIO_FORMAT,
+                    "-S",
+                    YTDLP_AUDIO_SORT,
+                    "--quiet",
+                    "-o",
+                    "-",
+                    url,
+                ],
+                stdout=subprocess.PIPE,
+                stderr=downloader_log,
+            )
+            decoder = subprocess.Popen(
+                pcm_command("pipe:0", audio_filter, sample_rate),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=decoder_log,
+            )
+            with open(temp_path, "wb") as cache_file:
+                tee = threading.Thread(
+                    target=_tee_stream,
+                    args=(downloader.stdout, decoder.stdin, cache_file),
+                )
+                tee.start()
+                pcm = decoder.stdout.read()
+                decoder.wait()
+                # 디코더가 먼저 실패하면 다운로드도 중단합니다.
+                if decoder.returncode != 0:
+                    downloader.kill()
+                tee.join()
+                downloader.wait()
+
+            for process, log, message in (
+                (downloader, downloader_log, "유튜브 오디오 다운로드 실패"),
+                (decoder, decoder_log, "음성 디코딩 실패"),
+            ):
+                if process.returncode != 0:
+                    os.remove(temp_path)
+                    log.seek(0)
+                    stderr = log.read().decode(errors="ignore")
+                    raise Exception(f"{message}: {stderr[-500:]}")
+
+    os.replace(temp_path, cache_path)
+    return np.frombuffer(pcm, np.float32)
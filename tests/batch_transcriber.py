@@ -0,0 +1,150 @@
+import sys
+import time
+
+import torch
+import whisper
+from whisper.audio import N_FRAMES, N_SAMPLES, log_mel_spectrogram, pad_or_trim
+from whisper.tokenizer import get_tokenizer
+
+from tests.audio_decoder import SAMPLE_RATE, decode_audio
+from tests.resumable_transcriber import (
+    DEFAULT_TEMPERATURE,
+    WindowDecoder,
+    new_state,
+    prompt_tokens,
+    select_dtype,
+    transcription_result,
+)
+
+# 상수 정의
+BATCH_SIZE = 16  # 인코더/디코더에 한 번에 넣는 30초 멜 창 수
+
+
+def batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+# 여러 짧은 오디오의 첫 30초 멜 창을 쌓아 인코더/디코더를 한 번에 실행
+# 창 하나로 끝나지 않는 파일은 남은 창을 파일별로 이어서 디코딩합니다.
+# 반환값은 입력 순서대로 model.transcribe(...)와 같은 형식의 결과 목록입니다.
+def transcribe_batch(
+    model,
+    audios,
+    *,
+    batch_size=BATCH_SIZE,
+    verbose=None,
+    temperature=DEFAULT_TEMPERATURE,
+    compression_ratio_threshold=2.4,
+    logprob_threshold=-1.0,
+    no_speech_threshold=0.6,
+    condition_on_previous_text=True,
+    initial_prompt=None,
+    **decode_options,
+):
+    if decode_options.get("word_timestamps"):
+        raise ValueError("묶음 전사는 word_timestamps를 지원하지 않습니다.")
+    decode_options.pop("word_timestamps", None)
+    dtype = select_dtype(model, decode_options)
+
+    mels = [
+        log_mel_spectrogram(a, model.dims.n_mels, padding=N_SAMPLES) for a in audios
+    ]
+    content_frames = [mel.shape[-1] - N_FRAMES for mel in mels]
+
+    def first_window(index):
+        return pad_or_trim(mels[index], N_FRAMES).to(model.device).to(dtype)
+
+    # 언어 감지도 첫 창들을 묶어서 한 번에
+    languages = [decode_options.get("language")] * len(mels)
+    if languages and languages[0] is None:
+        if not model.is_multilingual:
+            languages = ["en"] * len(mels)
+        else:
+            for indices in batches(list(range(len(mels))), batch_size):
+                mel_batch = torch.stack([first_window(i) for i in indices])
+                _, probs = model.detect_language(mel_batch)
+                for index, language_probs in zip(indices, probs):
+                    languages[index] = max(language_probs, key=language_probs.get)
+
+    results = [None] * len(mels)
+    # 언어마다 토크나이저(시작 토큰)가 다르므로 같은 언어끼리만 묶음
+    for language in dict.fromkeys(languages):
+        options = {**decode_options, "language": language}
+        tokenizer = get_tokenizer(
+            model.is_multilingual,
+            num_languages=model.num_languages,
+            language=language,
+            task=options.get("task", "transcribe"),
+        )
+        decoder = WindowDecoder(
+            model,
+            tokenizer,
+            dtype,
+            options,
+            temperature,
+            compression_ratio_threshold,
+            logprob_threshold,
+            no_speech_threshold,
+            condition_on_previous_text,
+        )
+        initial_prompt_tokens = prompt_tokens(tokenizer, initial_prompt)
+        group = [i for i, lang in enumerate(languages) if lang == language]
+        states = {i: new_state(initial_prompt_tokens) for i in group}
+
+        for indices in batches([i for i in group if content_frames[i] > 0], batch_size):
+            sizes = [min(N_FRAMES, content_frames[i]) for i in indices]
+            mel_batch = torch.stack(
+                [
+                    decoder.mel_window(mels[i], 0, size)
+                    for i, size in zip(indices, sizes)
+                ]
+            )
+            # 첫 창의 프롬프트는 모든 파일이 같음 (initial_prompt 또는 없음)
+            decoded = decoder.decode(mel_batch, list(initial_prompt_tokens))
+            for index, size, result in zip(indices, sizes, decoded):
+                decoder.apply(states[index], result, size)
+
+        for index in group:
+            decoder.run(states[index], mels[index], content_frames[index])
+            results[index] = transcription_result(
+                tokenizer, states[index], initial_prompt_tokens, language
+            )
+    return results
+
+
+# 짧은 파일 여러 개를 하나씩 전사할 때와 묶어서 전사할 때의 처리량 비교
+def main():
+    if len(sys.argv) < 2:
+        print(
+            "사용법: python -m tests.batch_transcriber <오디오/비디오 파일>... [--model 이름]"
+        )
+        return
+    args = sys.argv[1:]
+    model_name = "base"
+    if "--model" in args:
+        model_name = args[args.index("--model") + 1]
+        args = args[: args.index("--model")]
+    audios = [decode_audio(path) for path in args]
+    total_seconds = sum(len(audio) for audio in audios) / SAMPLE_RATE
+    model = whisper.load_model(model_name)
+
+    start = time.perf_counter()
+    for audio in audios:
+        model.transcribe(audio)
+    sequential_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    transcribe_batch(model, audios)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"파일 {len(audios)}개, 총 {total_seconds:.0f}초 분량")
+    for label, seconds in (("하나씩", sequential_seconds), ("묶음", batch_seconds)):
+        print(
+            f"{label}: {seconds:.1f}초, 분당 {len(audios) / seconds * 60:.1f}개 "
+            f"(RTF {seconds / total_seconds:.3f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import json
+import time
+
+from src.lib.logging_config import logger
+from tests import run
+
+# 상수 정의
+BENCH_PAGES = 5  # 비교할 페이지 수
+MAX_RESULTS = 50
+
+
+# 요청을 직접 실행하여 응답 크기(바이트)와 JSON 파싱 시간을 측정
+def measure_request(request):
+    response, content = request.http.request(
+        request.uri, method=request.method, body=request.body, headers=request.headers
+    )
+    if response.status != 200:
+        raise Exception(f"요청 실패 ({response.status}): {content[:200]}")
+    parse_start = time.perf_counter()
+    json.loads(content)
+    return len(content), time.perf_counter() - parse_start
+
+
+def main():
+    # 응답 캐시가 304로 응답 크기를 가리지 않도록 캐시 없이 측정합니다.
+    run.USE_HTTP_CACHE = False
+    youtube = run.get_youtube_service()
+    if not youtube:
+        return
+
+    likes_playlist_id = run.fetch_likes_playlist_id(youtube)
+    pages = []
+    page_token = None
+    for _ in range(BENCH_PAGES):
+        video_ids, page_token = run.fetch_playlist_page(
+            youtube, likes_playlist_id, MAX_RESULTS, page_token
+        )
+        pages.append(video_ids)
+        if not page_token:
+            break
+
+    for lean in (False, True):
+        total_bytes = 0
+        total_parse = 0.0
+        for video_ids in pages:
+            request = youtube.videos().list(
+                **run.video_request_params(video_ids, lean)
+            )
+            size, parse_seconds = measure_request(request)
+            total_bytes += size
+            total_parse += parse_seconds
+        mode = "lean" if lean else "full"
+        logger.info(
+            f"[{mode}] 페이지당 평균 {total_bytes / len(pages) / 1024:.1f} KiB, "
+            f"파싱 {total_parse / len(pages) * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+import functools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import torch
+
+from tests import speech_to_srt_converter, video_to_srt_converter
+from tests.audio_decoder import SAMPLE_RATE, decode_audio
+from tests.inference_backend import load_model, model_spec
+from tests.subtitle_writer import write_subtitles
+from tests.transcript_cache import TranscriptCache, audio_fingerprint
+
+# 상수 정의
+FIXTURE_SECONDS = 60  # 합성 비디오 길이
+MODELS = ["tiny", "base", "small"]
+RESULTS_DIR = "data/benchmarks"
+SAMPLE_INTERVAL = 0.05  # RSS 측정 간격 (초)
+REGRESSION_THRESHOLD = 1.10  # 이전 실행보다 이 배수 이상 느리면 표시
+# ffmpeg lavfi 소스로 만드는 합성 오디오
+# speech: 기본 주파수와 포먼트 근처 배음을 초당 4음절 정도로 변조하고 중간중간 쉼을 둠
+FIXTURE_SOURCES = {
+    "tone": "sine=frequency=440:sample_rate=44100",
+    "noise": "anoisesrc=color=pink:amplitude=0.3:sample_rate=44100",
+    "speech": (
+        "aevalsrc='(sin(2*PI*140*t)+0.5*sin(2*PI*280*t)+0.3*sin(2*PI*720*t)"
+        "+0.2*sin(2*PI*1240*t))*(0.5+0.5*sin(2*PI*4*t))"
+        "*gt(sin(2*PI*0.25*t),-0.4)*0.3':s=44100"
+    ),
+}
+
+
+# 검은 화면 + 합성 오디오의 mp4 (H.264 / AAC)를 만들어 이름 -> 경로로 반환
+def generate_fixtures(folder, seconds=FIXTURE_SECONDS):
+    fixtures = {}
+    for name, source in FIXTURE_SOURCES.items():
+        path = os.path.join(folder, f"{name}.mp4")
+        command = [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            f"{source}:d={seconds}",
+            "-f",
+            "lavfi",
+            "-i",
+            f"color=c=black:s=320x240:r=25:d={seconds}",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-pix_fmt",
+            "yuv420p",
+            "-c:a",
+            "aac",
+            "-shortest",
+            path,
+        ]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"테스트 비디오 생성 실패 ({name}): {result.stderr}")
+        fixtures[name] = path
+    return fixtures
+
+
+def process_rss(pid):
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+# 현재 프로세스와 그 자식(ffmpeg, yt-dlp 등) 프로세스들의 RSS 합계
+def tree_rss():
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+
+    pids = [os.getpid()]
+    total = 0
+    while pids:
+        pid = pids.pop()
+        try:
+            total += process_rss(pid)
+        except OSError:
+            continue
+        pids.extend(child for child, parent in parents.items() if parent == pid)
+    return total
+
+
+def cpu_seconds():
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (
+        self_usage.ru_utime
+        + self_usage.ru_stime
+        + children.ru_utime
+        + children.ru_stime
+    )
+
+
+# with 블록 동안의 경과 시간, CPU 시간(자식 포함), 최대 RSS를 측정
+class StageMonitor:
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stop = threading.Event()
+        self.peak_rss = 0
+
+    def sample(self):
+        while True:
+            self.peak_rss = max(self.peak_rss, tree_rss())
+            if self.stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+        self.start_cpu = cpu_seconds()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self.start
+        self.cpu_seconds = cpu_seconds() - self.start_cpu
+        self.stop.set()
+        self.thread.join()
+        self.peak_rss = max(self.peak_rss, tree_rss())
+
+
+# 단계 하나를 실행하고 결과 행을 results에 추가한 뒤 단계의 반환값을 돌려줌
+# duration은 입력 오디오 길이(초)이며, 없으면(모델 로드) RTF를 기록하지 않습니다.
+def measure(results, fixture, model, stage, duration, func, *args):
+    row = {"fixture": fixture, "model": model, "stage": stage}
+    value = None
+    try:
+        with StageMonitor() as monitor:
+            value = func(*args)
+    except Exception as e:
+        row["error"] = str(e)
+        print(f"{fixture:<8} {model:<12} {stage:<18} 실패: {e}")
+        results.append(row)
+        return None
+
+    row.update(
+        {
+            "seconds": monitor.seconds,
+            "rtf": monitor.seconds / duration if duration else None,
+            "cpu_seconds": monitor.cpu_seconds,
+            "cpu_utilization": monitor.cpu_seconds
+            / (monitor.seconds * (os.cpu_count() or 1)),
+            "peak_rss_mb": monitor.peak_rss / 1024 / 1024,
+        }
+    )
+    print_row(row)
+    results.append(row)
+    return value
+
+
+def print_row(row):
+    print(
+        f"{row['fixture']:<8} {row['model']:<12} {row['stage']:<18} "
+        f"{row['seconds']:>8.2f} {row['rtf'] or 0:>7.3f} "
+        f"{row['cpu_utilization']:>6.0%} {row['peak_rss_mb']:>8.0f}"
+    )
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+# download_video(yt-dlp)가 네트워크 없이 받을 수 있도록 테스트 비디오를 로컬 HTTP로 제공
+def serve_folder(folder):
+    handler = functools.partial(QuietHandler, directory=folder)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# 모델과 상관없는 단계: 다운로드, 음성 추출(1회 / 필터 2회), PCM 디코딩
+def bench_extraction(results, name, video_path, duration, work_dir, base_url):
+    measure(
+        results,
+        name,
+        "-",
+        "download_video",
+        duration,
+        speech_to_srt_converter.download_video,
+        f"{base_url}/{os.path.basename(video_path)}",
+        os.path.join(work_dir, f"{name}.download"),
+    )
+    measure(
+        results,
+        name,
+        "-",
+        "extract_audio",
+        duration,
+        speech_to_srt_converter.extract_audio,
+        video_path,
+        os.path.join(work_dir, f"{name}.mp3"),
+    )
+    measure(
+        results,
+        name,
+        "-",
+        "extract_filtered",
+        duration,
+        video_to_srt_converter.extract_audio,
+        video_path,
+        os.path.join(work_dir, f"{name}.filtered.mp3"),
+    )
+    return measure(
+        results,
+        name,
+        "-",
+        "decode_pcm",
+        duration,
+        decode_audio,
+        video_path,
+        video_to_srt_converter.AUDIO_FILTER,
+    )
+
+
+# 모델별 단계: 전사(새 캐시라 항상 실제로 전사)와 자막 파일 생성
+def bench_transcription(results, name, model_name, model, audio, work_dir):
+    duration = len(audio) / SAMPLE_RATE
+    cache = TranscriptCache(os.path.join(work_dir, f"cache-{model_name}-{name}"))
+    fingerprint = audio_fingerprint(audio)
+    segments = measure(
+        results,
+        name,
+        model_name,
+        "transcribe_audio",
+        duration,
+        video_to_srt_converter.transcribe_audio,
+        audio,
+        cache,
+        fingerprint,
+        model,
+        name,
+    )
+    if segments is None:
+        return
+    segments = list(segments)
+    prefix = os.path.join(work_dir, f"{name}-{model_name}")
+    measure(
+        results,
+        name,
+        model_name,
+        "create_srt",
+        duration,
+        video_to_srt_converter.create_srt,
+        segments,
+        f"{prefix}.srt",
+    )
+    measure(
+        results,
+        name,
+        model_name,
+        "create_json",
+        duration,
+        functools.partial(write_subtitles, json_path=f"{prefix}.json"),
+        segments,
+    )
+
+
+# 이전 결과와 (fixture, model, stage)별 시간을 비교해 느려진 단계를 표시
+def compare_results(previous_path, results):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {
+            (row["fixture"], row["model"], row["stage"]): row
+            for row in json.load(f)["results"]
+            if "seconds" in row
+        }
+    print(f"\n이전 실행과 비교: {previous_path}")
+    for row in results:
+        old = previous.get((row["fixture"], row["model"], row["stage"]))
+        if old is None or "seconds" not in row:
+            continue
+        ratio = row["seconds"] / old["seconds"] if old["seconds"] else 1.0
+        mark = "  <- 느려짐" if ratio > REGRESSION_THRESHOLD else ""
+        print(
+            f"{row['fixture']:<8} {row['model']:<12} {row['stage']:<18} "
+            f"{old['seconds']:>8.2f} -> {row['seconds']:>8.2f} ({ratio:.2f}배){mark}"
+        )
+
+
+def option(args, name, default):
+    if name not in args:
+        return default
+    return args[args.index(name) + 1]
+
+
+def main():
+    args = sys.argv[1:]
+    if "-h" in args or "--help" in args:
+        print(
+            "사용법: python -m tests.bench_pipeline [--models tiny,base,small] "
+            "[--backend fp32|int8|ctranslate2] [--seconds 60] "
+            "[--output 결과.json] [--compare 이전결과.json]"
+        )
+        return
+    models = option(args, "--models", ",".join(MODELS)).split(",")
+    backend = option(args, "--backend", "fp32")
+    seconds = int(option(args, "--seconds", FIXTURE_SECONDS))
+    output_path = option(
+        args,
+        "--output",
+        os.path.join(RESULTS_DIR, f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json"),
+    )
+
+    print(
+        f"{'fixture':<8} {'model':<12} {'stage':<18} "
+        f"{'sec':>8} {'RTF':>7} {'CPU':>6} {'RSS MB':>8}"
+    )
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        fixture_dir = os.path.join(work_dir, "fixtures")
+        os.makedirs(fixture_dir)
+        fixtures = generate_fixtures(fixture_dir, seconds)
+        server = serve_folder(fixture_dir)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        audios = {}
+        try:
+            for name, video_path in fixtures.items():
+                audio = bench_extraction(
+                    results, name, video_path, seconds, work_dir, base_url
+                )
+                if audio is not None:
+                    audios[name] = audio
+        finally:
+            server.shutdown()
+
+        # 모델 로드 후 전사 단계에서 새로 늘어나는 메모리만 보이도록 모델을 하나씩 올림
+        for model_name in models:
+            spec = model_spec(model_name, backend)
+            model = measure(results, "-", spec, "load_model", None, load_model, spec)
+            if model is None:
+                continue
+            for name, audio in audios.items():
+                bench_transcription(results, name, spec, model, audio, work_dir)
+            del model
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "cpu_count": os.cpu_count(),
+            "torch_threads": torch.get_num_threads(),
+        },
+        "fixture_seconds": seconds,
+        "fixtures": list(FIXTURE_SOURCES),
+        "models": models,
+        "backend": backend,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output_path}")
+
+    if "--compare" in args:
+        compare_results(option(args, "--compare", None), results)
+
+
+if __name__ == "__main__":
+    main()
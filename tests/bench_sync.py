@@ -0,0 +1,79 @@
+import os
+import tempfile
+import time
+
+from tests import run
+from tests.api_scheduler import ApiScheduler, TokenBucket
+from tests.fake_youtube import FakeYouTubeBackend, build_fake_youtube_service
+
+# 상수 정의
+VIDEO_COUNT = 5000  # 합성 좋아요 재생목록 크기
+LATENCY = 0.05  # 요청당 지연 시간 (초)
+NEW_LIKES = 30  # 증분 동기화 측정 시 추가할 새 좋아요 수
+
+# 전략 이름: sync_liked_videos 인자
+STRATEGIES = {
+    "per_row": {"prefetch_depth": 0, "bulk_insert": False},
+    "bulk": {"prefetch_depth": 0, "bulk_insert": True},
+    "pipelined": {"prefetch_depth": 2, "bulk_insert": True},
+}
+
+
+def run_sync(conn, backend, **options):
+    # 속도 제한 없이 전략 자체의 처리량을 측정합니다.
+    run.api_scheduler = ApiScheduler(bucket=TokenBucket(rate=1e9, capacity=1e9))
+    calls_before = sum(backend.calls.values())
+    quota_before = int(run.get_metadata(conn, run.quota_usage_key()) or 0)
+
+    start = time.perf_counter()
+    result = run.sync_liked_videos(
+        conn, lambda: build_fake_youtube_service(backend), **options
+    )
+    elapsed = time.perf_counter() - start
+    if result is None:
+        raise Exception("동기화 실패")
+
+    return {
+        "pages": result["pages"],
+        "rows": len(result["videos"]),
+        "seconds": elapsed,
+        "api_calls": sum(backend.calls.values()) - calls_before,
+        "quota_units": run.api_scheduler.used - quota_before,
+    }
+
+
+def print_result(name, stats):
+    print(
+        f"{name:<24} {stats['pages']:>6} {stats['rows']:>7} "
+        f"{stats['seconds']:>8.2f} {stats['pages'] / stats['seconds']:>9.1f} "
+        f"{stats['rows'] / stats['seconds']:>9.0f} "
+        f"{stats['api_calls']:>6} {stats['quota_units']:>6}"
+    )
+
+
+def main():
+    print(f"합성 좋아요 {VIDEO_COUNT}개, 요청당 지연 {LATENCY * 1000:.0f}ms")
+    print(
+        f"{'전략':<22} {'pages':>6} {'rows':>7} {'sec':>8} "
+        f"{'pages/s':>9} {'rows/s':>9} {'calls':>6} {'quota':>6}"
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, options in STRATEGIES.items():
+            backend = FakeYouTubeBackend(VIDEO_COUNT, LATENCY)
+            conn = run.create_connection(os.path.join(temp_dir, f"{name}.db"))
+            run.create_table(conn)
+
+            print_result(name, run_sync(conn, backend, incremental=False, **options))
+
+            # 새 좋아요를 추가한 뒤 증분 동기화
+            backend.add_likes(NEW_LIKES)
+            print_result(
+                f"{name}+incremental",
+                run_sync(conn, backend, incremental=True, **options),
+            )
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import tempfile
+
+import whisper
+
+from tests.audio_decoder import decode_audio
+from tests.batch_transcriber import transcribe_batch
+from tests.resumable_transcriber import transcribe_resumable
+
+# 상수 정의
+# 이어서 전사하기와 묶음 전사는 whisper.transcribe의 창 단위 디코딩을 옮겨 온 것이므로
+# 같은 모델과 옵션이면 구간 경계와 토큰까지 같아야 합니다.
+EXACT_FIELDS = ("seek", "start", "end", "text", "tokens", "temperature")
+CLOSE_FIELDS = ("avg_logprob", "compression_ratio", "no_speech_prob")
+TOLERANCE = 1e-4
+# 변환기와 같은 음악 관련 토큰 억제
+DECODE_OPTIONS = {
+    "suppress_tokens": [-1, 1, 2, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20]
+}
+
+
+# 두 전사 결과의 차이를 설명하는 문자열 목록 (같으면 빈 목록)
+def compare_results(expected, actual):
+    differences = []
+    if expected["language"] != actual["language"]:
+        differences.append(f"언어: {expected['language']} != {actual['language']}")
+    if expected["text"] != actual["text"]:
+        differences.append("전체 텍스트가 다릅니다")
+    if len(expected["segments"]) != len(actual["segments"]):
+        differences.append(
+            f"구간 수: {len(expected['segments'])} != {len(actual['segments'])}"
+        )
+    for i, (e, a) in enumerate(zip(expected["segments"], actual["segments"])):
+        for field in EXACT_FIELDS:
+            if e[field] != a[field]:
+                differences.append(f"구간 {i} {field}: {e[field]!r} != {a[field]!r}")
+        for field in CLOSE_FIELDS:
+            if abs(e[field] - a[field]) > TOLERANCE:
+                differences.append(f"구간 {i} {field}: {e[field]} != {a[field]}")
+    return differences
+
+
+# 한 번에 끝까지 전사한 결과와, 첫 창까지만 기록된 체크포인트에서 이어서 전사한 결과를
+# 모두 whisper.transcribe와 비교
+def check_resumable(model, audio, expected, options):
+    differences = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        checkpoint_path = os.path.join(temp_dir, "checkpoint.jsonl")
+        result = transcribe_resumable(model, audio, checkpoint_path, **options)
+        differences["이어서 전사 (처음부터)"] = compare_results(expected, result)
+
+        # 헤더와 첫 창 기록만 남겨 중단된 상태를 만든 뒤 다시 실행
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        with open(checkpoint_path, "w", encoding="utf-8") as f:
+            f.writelines(lines[:2])
+        result = transcribe_resumable(model, audio, checkpoint_path, **options)
+        differences["이어서 전사 (중단 후)"] = compare_results(expected, result)
+    return differences
+
+
+# 옮겨 온 디코딩 루프가 whisper.transcribe와 같은 결과를 내는지 확인 (다르면 종료 코드 1)
+def main():
+    if len(sys.argv) < 2:
+        print(
+            "사용법: python -m tests.check_transcribe_equivalence "
+            "<오디오/비디오 파일>... [--model 이름]"
+        )
+        return
+    args = sys.argv[1:]
+    model_name = "base"
+    if "--model" in args:
+        model_name = args[args.index("--model") + 1]
+        args = args[: args.index("--model")]
+    model = whisper.load_model(model_name)
+    audios = [decode_audio(path) for path in args]
+    # 변환기는 word_timestamps 없이 전사하며, 이어서 전사하기도 이를 지원하지 않음
+    options = {**DECODE_OPTIONS, "fp16": False}
+    expected = [
+        whisper.transcribe(model, audio, verbose=None, **options) for audio in audios
+    ]
+
+    # 묶음 전사는 여러 파일의 첫 창을 쌓아 한 번에 디코딩하므로 모든 파일을 함께 넣음
+    batch_results = transcribe_batch(model, audios, **options)
+
+    failed = False
+    for path, audio, reference, batch_result in zip(
+        args, audios, expected, batch_results
+    ):
+        checks = check_resumable(model, audio, reference, options)
+        checks["묶음 전사"] = compare_results(reference, batch_result)
+        for label, differences in checks.items():
+            failed = failed or bool(differences)
+            print(f"{path} - {label}: {'다름' if differences else '같음'}")
+            for difference in differences[:10]:
+                print(f"  {difference}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import torch
+
+from tests import inference_backend
+from tests.audio_decoder import SAMPLE_RATE, decode_audio
+from tests.resumable_transcriber import transcribe_resumable
+
+# 상수 정의
+FRAME_SECONDS = 0.03  # 에너지 계산 프레임 길이
+MIN_CHUNK_SECONDS = 60  # 이보다 짧게는 자르지 않음
+MAX_CHUNK_SECONDS = 300  # 청크 최대 길이
+# 잡음 바닥(10번째 백분위수)보다 이만큼 큰 에너지까지 무음으로 간주
+SILENCE_MARGIN_DB = 10
+NUM_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# 작업 프로세스마다 한 번만 로드해 두는 모델
+_worker_model = None
+
+
+# 프레임별 에너지(dB) 계산
+def frame_energy_db(audio, sample_rate=SAMPLE_RATE, frame_seconds=FRAME_SECONDS):
+    frame_length = int(sample_rate * frame_seconds)
+    frame_count = len(audio) // frame_length
+    frames = audio[: frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    return 20 * np.log10(rms + 1e-10)
+
+
+# 무음 구간에서 오디오를 잘라 (시작 샘플, 끝 샘플) 목록을 반환
+# 각 청크는 MAX_CHUNK_SECONDS 이하이며, 허용 범위 안에서 가장 조용한 프레임에서 자릅니다.
+def split_on_silence(
+    audio,
+    sample_rate=SAMPLE_RATE,
+    min_chunk_seconds=MIN_CHUNK_SECONDS,
+    max_chunk_seconds=MAX_CHUNK_SECONDS,
+):
+    total = len(audio)
+    max_samples = int(max_chunk_seconds * sample_rate)
+    if total <= max_samples:
+        return [(0, total)]
+
+    frame_length = int(sample_rate * FRAME_SECONDS)
+    energy = frame_energy_db(audio, sample_rate)
+    threshold = np.percentile(energy, 10) + SILENCE_MARGIN_DB
+    min_frames = int(min_chunk_seconds / FRAME_SECONDS)
+    max_frames = int(max_chunk_seconds / FRAME_SECONDS)
+
+    chunks = []
+    start_frame = 0
+    while (len(audio) - start_frame * frame_length) > max_samples:
+        window = energy[start_frame + min_frames : start_frame + max_frames]
+        silent = np.flatnonzero(window <= threshold)
+        # 무음 프레임이 있으면 가장 뒤쪽 무음에서, 없으면 가장 조용한 프레임에서 자름
+        offset = silent[-1] if len(silent) else int(np.argmin(window))
+        cut_frame = start_frame + min_frames + int(offset)
+        chunks.append((start_frame * frame_length, cut_frame * frame_length))
+        start_frame = cut_frame
+    chunks.append((start_frame * frame_length, total))
+    return chunks
+
+
+def init_worker(model_name, num_threads):
+    global _worker_model
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+    _worker_model = inference_backend.load_model(model_name)
+
+
+def transcribe_chunk(chunk_audio, options, checkpoint=None):
+    if checkpoint:
+        path, key = checkpoint
+        result = transcribe_resumable(_worker_model, chunk_audio, path, key, **options)
+    else:
+        result = _worker_model.transcribe(chunk_audio, **options)
+    return result["segments"]
+
+
+# 청크별 결과의 시간과 seek를 원래 오디오 기준으로 되돌려 하나의 segments로 합침
+def stitch_segments(chunk_results, chunk_offsets):
+    segments = []
+    for chunk_segments, offset in zip(chunk_results, chunk_offsets):
+        for segment in chunk_segments:
+            segment = dict(segment)
+            segment["id"] = len(segments)
+            segment["start"] += offset
+            segment["end"] += offset
+            # seek는 멜 프레임(10ms) 단위입니다.
+            segment["seek"] = segment.get("seek", 0) + int(offset * 100)
+            if "words" in segment:
+                segment["words"] = [
+                    dict(word, start=word["start"] + offset, end=word["end"] + offset)
+                    for word in segment["words"]
+                ]
+            segments.append(segment)
+    return segments
+
+
+# 긴 오디오(16kHz float32 PCM)를 무음 구간에서 나누어 여러 프로세스로 동시에 전사
+# 반환값은 model.transcribe(...)["segments"]와 같은 형식입니다.
+# checkpoint=(경로, 키)를 주면 청크마다 따로 체크포인트를 남겨 이어서 전사할 수 있습니다.
+def transcribe_long_audio(
+    audio, model_name, workers=NUM_WORKERS, checkpoint=None, **options
+):
+    chunks = split_on_silence(audio)
+    checkpoints = [None] * len(chunks)
+    if checkpoint:
+        path, key = checkpoint
+        checkpoints = [
+            (f"{path}.{index}", f"{key}:{start}:{end}")
+            for index, (start, end) in enumerate(chunks)
+        ]
+    workers = max(1, min(workers, len(chunks)))
+    threads_per_worker = max(1, NUM_WORKERS // workers)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=init_worker,
+        initargs=(model_name, threads_per_worker),
+    ) as executor:
+        results = list(
+            executor.map(
+                transcribe_chunk,
+                [audio[start:end] for start, end in chunks],
+                [options] * len(chunks),
+                checkpoints,
+            )
+        )
+    return stitch_segments(results, [start / SAMPLE_RATE for start, _ in chunks])
+
+
+# 긴 입력에 대해 순차 전사와 청크 병렬 전사의 실행 시간을 비교
+def main():
+    if len(sys.argv) < 2:
+        print("사용법: python -m tests.chunked_transcriber <오디오/비디오 파일> [모델]")
+        return
+    audio = decode_audio(sys.argv[1])
+    model_name = sys.argv[2] if len(sys.argv) > 2 else "base"
+    duration = len(audio) / SAMPLE_RATE
+    chunks = split_on_silence(audio)
+    print(
+        f"입력 길이 {duration:.0f}초, 청크 {len(chunks)}개, 작업 프로세스 {NUM_WORKERS}개"
+    )
+
+    start = time.perf_counter()
+    model = inference_backend.load_model(model_name)
+    sequential = model.transcribe(audio)["segments"]
+    sequential_seconds = time.perf_counter() - start
+    del model
+
+    start = time.perf_counter()
+    parallel = transcribe_long_audio(audio, model_name)
+    parallel_seconds = time.perf_counter() - start
+
+    print(f"순차: {sequential_seconds:.1f}초 ({len(sequential)}개 구간)")
+    print(f"병렬: {parallel_seconds:.1f}초 ({len(parallel)}개 구간)")
+    print(f"속도 향상: {sequential_seconds / parallel_seconds:.2f}배")
+
+
+if __name__ == "__main__":
+    main()
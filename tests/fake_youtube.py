@@ -0,0 +1,122 @@
+import hashlib
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+from googleapiclient.discovery import build
+
+# 상수 정의
+LIKES_PLAYLIST_ID = "LLfake"
+DEFAULT_LATENCY = 0.05  # 요청당 지연 시간 (초)
+
+
+# 실제 API 없이 channels / playlistItems / videos 응답을 만드는 가짜 YouTube 백엔드
+# 좋아요 재생목록은 실제와 같이 최신순으로 정렬됩니다.
+class FakeYouTubeBackend:
+    def __init__(self, video_count=1000, latency=DEFAULT_LATENCY):
+        self.video_count = video_count
+        self.latency = latency
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def video_id(index):
+        return f"v{index:010d}"
+
+    # 새 좋아요 n개를 재생목록 맨 앞에 추가
+    def add_likes(self, count):
+        with self.lock:
+            self.video_count += count
+
+    def playlist_ids(self):
+        return [self.video_id(i) for i in range(self.video_count - 1, -1, -1)]
+
+    def video_resource(self, video_id):
+        index = int(video_id[1:])
+        return {
+            "kind": "youtube#video",
+            "etag": hashlib.md5(video_id.encode()).hexdigest(),
+            "id": video_id,
+            "snippet": {
+                "publishedAt": f"2020-01-01T00:00:{index % 60:02d}Z",
+                "channelId": f"UC{index % 97:022d}",
+                "title": f"테스트 동영상 {index}",
+                "description": "합성 설명 " * 40,
+                "thumbnails": {
+                    size: {"url": f"https://i.ytimg.com/vi/{video_id}/{size}.jpg"}
+                    for size in ("default", "medium", "high", "standard", "maxres")
+                },
+                "channelTitle": f"채널 {index % 97}",
+                "tags": [f"tag{index % 13}", f"tag{index % 7}"],
+                "categoryId": str(index % 30),
+            },
+            "contentDetails": {"duration": f"PT{index % 59}M{index % 60}S"},
+            "statistics": {"viewCount": str(index * 10), "likeCount": str(index)},
+        }
+
+    def handle(self, resource, params):
+        with self.lock:
+            self.calls[resource] = self.calls.get(resource, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if resource == "channels":
+            return {
+                "items": [
+                    {
+                        "id": "UCfake",
+                        "contentDetails": {
+                            "relatedPlaylists": {"likes": LIKES_PLAYLIST_ID}
+                        },
+                    }
+                ]
+            }
+
+        if resource == "playlistItems":
+            max_results = int(params.get("maxResults", 5))
+            offset = int(params.get("pageToken", 0))
+            ids = self.playlist_ids()
+            page = ids[offset : offset + max_results]
+            response = {
+                "items": [
+                    {"contentDetails": {"videoId": video_id}} for video_id in page
+                ],
+                "pageInfo": {"totalResults": len(ids), "resultsPerPage": max_results},
+            }
+            if offset + max_results < len(ids):
+                response["nextPageToken"] = str(offset + max_results)
+            return response
+
+        if resource == "videos":
+            ids = [video_id for video_id in params.get("id", "").split(",") if video_id]
+            return {"items": [self.video_resource(video_id) for video_id in ids]}
+
+        raise ValueError(f"지원하지 않는 리소스입니다: {resource}")
+
+
+# googleapiclient의 HttpMock과 같은 방식으로 요청을 가로채는 전송 계층
+class FakeYouTubeHttp:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        parsed = urlparse(uri)
+        resource = parsed.path.rstrip("/").split("/")[-1]
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        try:
+            content = json.dumps(self.backend.handle(resource, params)).encode()
+            status = "200"
+        except ValueError as e:
+            content = json.dumps({"error": {"code": 404, "message": str(e)}}).encode()
+            status = "404"
+        response = httplib2.Response(
+            {"status": status, "content-type": "application/json; charset=UTF-8"}
+        )
+        return response, content
+
+
+# 번들된 실제 discovery 문서로 서비스 객체를 만들고 요청만 가짜 백엔드로 보냅니다.
+def build_fake_youtube_service(backend):
+    return build("youtube", "v3", http=FakeYouTubeHttp(backend), static_discovery=True)
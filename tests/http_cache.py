@@ -0,0 +1,113 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+import httplib2
+
+# 상수 정의
+HTTP_CACHE_FILE = "http_cache.db"
+HTTP_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 캐시 최대 크기 (64MB)
+
+
+# ETag 기반 YouTube Data API 응답 캐시
+# 저장된 응답이 있으면 If-None-Match를 보내고, 304 응답이면 캐시된 본문을 돌려줍니다.
+# 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 응답부터 삭제합니다.
+class ETagCachingHttp(httplib2.Http):
+    def __init__(self, cache_file=HTTP_CACHE_FILE, max_bytes=HTTP_CACHE_MAX_BYTES):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.cache_conn = sqlite3.connect(cache_file)
+        self.cache_conn.execute("PRAGMA journal_mode = WAL")
+        self.cache_conn.execute(
+            """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            etag TEXT,
+            headers TEXT,
+            content BLOB,
+            size INTEGER,
+            last_used REAL
+        )
+        """
+        )
+        self.cache_conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)"
+        )
+        self.cache_conn.commit()
+
+    @staticmethod
+    def cache_key(uri, method, body):
+        digest = hashlib.sha256()
+        digest.update(method.encode())
+        digest.update(uri.encode())
+        if body:
+            digest.update(body if isinstance(body, bytes) else body.encode())
+        return digest.hexdigest()
+
+    def request(self, uri, method="GET", body=None, headers=None, *args, **kwargs):
+        if method != "GET":
+            return super().request(uri, method, body, headers, *args, **kwargs)
+
+        key = self.cache_key(uri, method, body)
+        cached = self.cache_conn.execute(
+            "SELECT etag, headers, content FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+
+        headers = dict(headers or {})
+        if cached:
+            headers["if-none-match"] = cached[0]
+
+        response, content = super().request(uri, method, body, headers, *args, **kwargs)
+
+        if cached and response.status == 304:
+            self.hits += 1
+            with self.cache_conn:
+                self.cache_conn.execute(
+                    "UPDATE responses SET last_used = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+            return httplib2.Response(json.loads(cached[1])), cached[2]
+
+        self.misses += 1
+        etag = response.get("etag")
+        if response.status == 200 and etag:
+            self._store(key, etag, response, content)
+        return response, content
+
+    def _store(self, key, etag, response, content):
+        with self.cache_conn:
+            self.cache_conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, etag, headers, content, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    etag,
+                    json.dumps(dict(response)),
+                    content,
+                    len(content),
+                    time.time(),
+                ),
+            )
+            self._evict()
+
+    # LRU 순서로 삭제하여 전체 캐시 크기를 max_bytes 이하로 유지
+    def _evict(self):
+        total = self.cache_conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        cursor = self.cache_conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_used ASC"
+        )
+        stale_keys = []
+        for key, size in cursor:
+            if total <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+        self.cache_conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
@@ -0,0 +1,173 @@
+import sys
+import time
+
+import torch
+import whisper
+
+from tests.audio_decoder import SAMPLE_RATE, decode_audio
+from tests.transcript_metrics import segments_text, word_error_rate
+
+# 상수 정의
+# fp32: 기본 PyTorch 모델
+# int8: 선형 계층만 int8 동적 양자화한 PyTorch 모델 (같은 체크포인트, CPU 전용)
+# ctranslate2: faster-whisper(CTranslate2) 런타임의 int8 모델 (pip install faster-whisper)
+BACKENDS = ("fp32", "int8", "ctranslate2")
+SPEC_SEPARATOR = ":"  # 모델 이름과 백엔드를 합친 표기 (예: "small:int8")
+# faster-whisper에 다른 이름으로 넘기거나 넘기지 않는 Whisper 옵션
+CTRANSLATE2_RENAMED = {
+    "logprob_threshold": "log_prob_threshold",
+    "sample_len": "max_new_tokens",
+}
+CTRANSLATE2_IGNORED = ("verbose", "fp16", "prompt")
+
+
+# 모델 이름과 백엔드를 하나의 문자열로 (fp32는 이름 그대로라 예전 캐시 키가 유지됨)
+def model_spec(model_name, backend="fp32"):
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 추론 백엔드: {backend} (가능: {BACKENDS})")
+    if backend == "fp32":
+        return model_name
+    return f"{model_name}{SPEC_SEPARATOR}{backend}"
+
+
+def parse_spec(spec):
+    model_name, _, backend = spec.partition(SPEC_SEPARATOR)
+    return model_name, backend or "fp32"
+
+
+# 30초 창 단위로 model.decode를 직접 부르는 전사(체크포인트, 묶음 전사)가 가능한지
+def supports_window_decoding(spec):
+    return parse_spec(spec)[1] != "ctranslate2"
+
+
+# Whisper의 Linear는 nn.Linear의 하위 클래스라 quantize_dynamic이 건너뛰므로
+# 같은 가중치의 nn.Linear로 바꾼 뒤 int8로 양자화합니다.
+# 합성곱과 임베딩(출력 로짓 계산 포함)은 fp32로 남습니다.
+def quantize_linear_layers(model):
+    def to_plain_linear(module):
+        for name, child in module.named_children():
+            if (
+                isinstance(child, torch.nn.Linear)
+                and type(child) is not torch.nn.Linear
+            ):
+                linear = torch.nn.Linear(
+                    child.in_features, child.out_features, bias=child.bias is not None
+                )
+                linear.load_state_dict(child.state_dict())
+                setattr(module, name, linear)
+            else:
+                to_plain_linear(child)
+
+    to_plain_linear(model)
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+# faster-whisper 모델을 model.transcribe(audio, **options)와 같은 형식으로 감쌈
+class CTranslate2Model:
+    def __init__(self, model_name):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type="int8",
+            cpu_threads=torch.get_num_threads(),
+        )
+
+    def transcribe(self, audio, **options):
+        options = {
+            CTRANSLATE2_RENAMED.get(name, name): value
+            for name, value in options.items()
+            if name not in CTRANSLATE2_IGNORED and value is not None
+        }
+        # Whisper는 beam_size가 없으면 탐욕 디코딩 (faster-whisper 기본값은 5)
+        options.setdefault("beam_size", 1)
+        segments, info = self.model.transcribe(audio, **options)
+        segments = [
+            {
+                "id": i,
+                "seek": segment.seek,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "tokens": list(segment.tokens),
+                "temperature": getattr(segment, "temperature", 0.0),
+                "avg_logprob": segment.avg_logprob,
+                "compression_ratio": segment.compression_ratio,
+                "no_speech_prob": segment.no_speech_prob,
+            }
+            for i, segment in enumerate(segments)
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": info.language,
+        }
+
+
+# "small", "small:int8", "small:ctranslate2" 같은 표기로 모델 로드
+def load_model(spec):
+    model_name, backend = parse_spec(spec)
+    if backend == "ctranslate2":
+        return CTranslate2Model(model_name)
+    if backend == "int8":
+        return quantize_linear_layers(whisper.load_model(model_name, device="cpu"))
+    if backend == "fp32":
+        return whisper.load_model(model_name)
+    raise ValueError(f"알 수 없는 추론 백엔드: {backend} (가능: {BACKENDS})")
+
+
+# 같은 오디오를 백엔드별로 전사해 fp32 결과 대비 WER과 RTF를 비교
+def main():
+    if len(sys.argv) < 2:
+        print(
+            "사용법: python -m tests.inference_backend <오디오/비디오 파일> "
+            "[--model 이름] [--backends fp32,int8,ctranslate2]"
+        )
+        return
+    args = sys.argv[1:]
+    model_name = "small"
+    backends = list(BACKENDS)
+    if "--backends" in args:
+        backends = args[args.index("--backends") + 1].split(",")
+        del args[args.index("--backends") : args.index("--backends") + 2]
+    if "--model" in args:
+        model_name = args[args.index("--model") + 1]
+        del args[args.index("--model") : args.index("--model") + 2]
+    # WER 기준이 되는 fp32는 항상 먼저 실행
+    backends = ["fp32"] + [b for b in backends if b != "fp32"]
+
+    audio = decode_audio(args[0])
+    duration = len(audio) / SAMPLE_RATE
+    print(
+        f"입력 길이 {duration:.0f}초, 모델 {model_name}, 스레드 {torch.get_num_threads()}개"
+    )
+
+    reference = None
+    for backend in backends:
+        start = time.perf_counter()
+        try:
+            model = load_model(model_spec(model_name, backend))
+        except ImportError as e:
+            print(f"{backend}: 건너뜀 ({e})")
+            continue
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        text = segments_text(model.transcribe(audio)["segments"])
+        seconds = time.perf_counter() - start
+        del model
+
+        if reference is None:
+            reference = text
+        print(
+            f"{backend}: 로드 {load_seconds:.1f}초, 전사 {seconds:.1f}초 "
+            f"(RTF {seconds / duration:.3f}), "
+            f"fp32 대비 WER {word_error_rate(reference, text):.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
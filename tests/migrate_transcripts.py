@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+
+from tests.transcript_cache import CACHE_DIR, TranscriptCache, atomic_write
+from tests.transcript_format import FILE_EXTENSION, encode_transcript, read_transcript
+
+# 상수 정의
+# 이름 기반 캐시(data/cache/{base_name}_transcript.json)는 변환하지 않습니다.
+# "video_to_srt_converter copy.py"와 video_to_srt_converter_basic.py가 아직 이 JSON을
+# 직접 읽고, 어떤 모델과 옵션으로 만든 결과인지 기록되어 있지 않아 내용 기반 캐시의
+# 키로 옮길 수도 없습니다.
+MIGRATION_FOLDERS = [CACHE_DIR]
+
+
+# JSON 전사 파일 하나를 같은 이름의 바이너리 파일로 변환하고 (이전 크기, 새 크기) 반환
+def convert_json_file(json_path, delete=False):
+    with open(json_path, "r", encoding="utf-8") as f:
+        segments = json.load(f)
+    binary_path = os.path.splitext(json_path)[0] + FILE_EXTENSION
+    atomic_write(binary_path, encode_transcript(segments))
+    # 구간 수와 텍스트가 그대로인지 확인한 뒤에만 원본을 지웁니다.
+    converted = read_transcript(binary_path)
+    if [s["text"] for s in converted] != [s.get("text", "") for s in segments]:
+        os.remove(binary_path)
+        raise ValueError(f"변환 결과가 원본과 다릅니다: {json_path}")
+    old_size = os.path.getsize(json_path)
+    if delete:
+        os.remove(json_path)
+    return old_size, os.path.getsize(binary_path)
+
+
+# 내용 기반 캐시의 {키}.json 항목을 변환
+def migrate_folder(folder, delete=False):
+    paths = []
+    cache = None
+    if os.path.exists(os.path.join(folder, "manifest.json")):
+        cache = TranscriptCache(folder)
+        with cache.manifest() as manifest:
+            keys = list(manifest)
+        paths = [
+            os.path.join(folder, f"{key}.json")
+            for key in keys
+            if os.path.exists(os.path.join(folder, f"{key}.json"))
+        ]
+
+    totals = [0, 0]
+    for path in paths:
+        try:
+            old_size, new_size = convert_json_file(path, delete)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"변환 실패 ({path}): {e}")
+            continue
+        totals[0] += old_size
+        totals[1] += new_size
+        print(f"{path}: {old_size:,} -> {new_size:,} 바이트")
+
+    # 캐시 항목 크기가 바뀌었으므로 manifest도 갱신
+    if cache is not None:
+        with cache.manifest() as manifest:
+            for key, entry in manifest.items():
+                entry_path = cache.entry_path(key)
+                if os.path.exists(entry_path):
+                    entry["size"] = os.path.getsize(entry_path)
+    return len(paths), totals[0], totals[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="JSON 전사 캐시를 열 단위 바이너리 형식으로 변환"
+    )
+    parser.add_argument("folders", nargs="*", default=MIGRATION_FOLDERS)
+    parser.add_argument(
+        "--delete", action="store_true", help="변환에 성공한 JSON 파일 삭제"
+    )
+    args = parser.parse_args()
+
+    for folder in args.folders:
+        if not os.path.isdir(folder):
+            continue
+        count, old_size, new_size = migrate_folder(folder, args.delete)
+        if count:
+            print(
+                f"{folder}: {count}개 파일, {old_size:,} -> {new_size:,} 바이트 "
+                f"({new_size / max(old_size, 1):.0%})"
+            )
+
+
+if __name__ == "__main__":
+    main()
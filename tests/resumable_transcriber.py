@@ -0,0 +1,386 @@
+import json
+import os
+import warnings
+
+import torch
+from whisper.audio import (
+    HOP_LENGTH,
+    N_FRAMES,
+    N_SAMPLES,
+    SAMPLE_RATE,
+    log_mel_spectrogram,
+    pad_or_trim,
+)
+from whisper.decoding import DecodingOptions
+from whisper.tokenizer import get_tokenizer
+from whisper.utils import exact_div
+
+# 상수 정의
+DEFAULT_TEMPERATURE = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+# 30초 창 단위 진행 상황을 한 줄씩 덧붙이는 체크포인트 파일
+# 첫 줄: {"key", "language"}, 이후 창마다: {"seek", "segments", "prompt_reset"}
+class Checkpoint:
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+
+    # 저장된 (언어, 창 기록 목록)을 읽음. 키가 다르면 처음부터 다시 시작
+    # 쓰다가 끊긴 마지막 줄은 버리고 파일도 그 앞까지 잘라 둡니다.
+    def load(self):
+        if not os.path.exists(self.path):
+            return None, []
+        records = []
+        valid_size = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+                valid_size += len(line)
+        if not records or records[0].get("key") != self.key:
+            os.remove(self.path)
+            return None, []
+        with open(self.path, "r+b") as f:
+            f.truncate(valid_size)
+        return records[0]["language"], records[1:]
+
+    def append(self, record):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def start(self, language):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"key": self.key, "language": language}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+# whisper.transcribe와 같이 CPU에서는 fp16 대신 fp32를 사용
+def select_dtype(model, decode_options):
+    dtype = torch.float16 if decode_options.get("fp16", True) else torch.float32
+    if model.device == torch.device("cpu"):
+        if torch.cuda.is_available():
+            warnings.warn("Performing inference on CPU when CUDA is available")
+        if dtype == torch.float16:
+            warnings.warn("FP16 is not supported on CPU; using FP32 instead")
+            dtype = torch.float32
+    if dtype == torch.float32:
+        decode_options["fp16"] = False
+    return dtype
+
+
+# 전사 진행 상태: 다음 창 위치, 지금까지의 구간과 토큰, 프롬프트 시작 위치
+def new_state(initial_prompt_tokens):
+    return {
+        "seek": 0,
+        "all_tokens": list(initial_prompt_tokens),
+        "all_segments": [],
+        "prompt_reset_since": 0,
+    }
+
+
+# 창 하나의 기록({"seek", "segments", "prompt_reset"})을 상태에 반영
+def restore_window(state, record):
+    state["seek"] = record["seek"]
+    state["all_segments"].extend(record["segments"])
+    state["all_tokens"].extend(
+        token for segment in record["segments"] for token in segment["tokens"]
+    )
+    if record["prompt_reset"]:
+        state["prompt_reset_since"] = len(state["all_tokens"])
+
+
+# whisper.transcribe의 창 단위 디코딩 규칙 (word_timestamps 제외)
+# 디코딩, temperature 대체, 구간 나누기, seek 이동을 한 곳에 모아
+# 이어서 전사하기와 짧은 파일 묶음 전사가 같은 결과를 내도록 합니다.
+class WindowDecoder:
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        dtype,
+        decode_options,
+        temperature=DEFAULT_TEMPERATURE,
+        compression_ratio_threshold=2.4,
+        logprob_threshold=-1.0,
+        no_speech_threshold=0.6,
+        condition_on_previous_text=True,
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.dtype = dtype
+        self.decode_options = decode_options
+        self.temperatures = (
+            [temperature] if isinstance(temperature, (int, float)) else temperature
+        )
+        self.compression_ratio_threshold = compression_ratio_threshold
+        self.logprob_threshold = logprob_threshold
+        self.no_speech_threshold = no_speech_threshold
+        self.condition_on_previous_text = condition_on_previous_text
+        # 출력 토큰당 멜 프레임 수 (2)와 시간 (0.02초)
+        self.input_stride = exact_div(N_FRAMES, model.dims.n_audio_ctx)
+        self.time_precision = self.input_stride * HOP_LENGTH / SAMPLE_RATE
+
+    def needs_fallback(self, result):
+        needs_fallback = False
+        if (
+            self.compression_ratio_threshold is not None
+            and result.compression_ratio > self.compression_ratio_threshold
+        ):
+            needs_fallback = True  # 반복이 너무 많음
+        if (
+            self.logprob_threshold is not None
+            and result.avg_logprob < self.logprob_threshold
+        ):
+            needs_fallback = True  # 평균 로그 확률이 너무 낮음
+        if (
+            self.no_speech_threshold is not None
+            and result.no_speech_prob > self.no_speech_threshold
+            and self.logprob_threshold is not None
+            and result.avg_logprob < self.logprob_threshold
+        ):
+            needs_fallback = False  # 무음
+        return needs_fallback
+
+    # (창 수, n_mels, N_FRAMES) 멜 묶음을 한 번에 디코딩
+    # 기준을 통과하지 못한 창만 모아 다음 temperature로 다시 디코딩합니다.
+    def decode(self, mel_batch, prompt):
+        results = [None] * len(mel_batch)
+        pending = list(range(len(mel_batch)))
+        for t in self.temperatures:
+            kwargs = {**self.decode_options, "prompt": prompt}
+            if t > 0:
+                kwargs.pop("beam_size", None)
+                kwargs.pop("patience", None)
+            else:
+                kwargs.pop("best_of", None)
+
+            options = DecodingOptions(**kwargs, temperature=t)
+            decoded = self.model.decode(mel_batch[pending], options)
+            for index, result in zip(pending, decoded):
+                results[index] = result
+            pending = [i for i in pending if self.needs_fallback(results[i])]
+            if not pending:
+                break
+        return results
+
+    def mel_window(self, mel, seek, segment_size):
+        mel_segment = mel[:, seek : seek + segment_size]
+        return pad_or_trim(mel_segment, N_FRAMES).to(self.model.device).to(self.dtype)
+
+    def new_segment(self, *, seek, start, end, tokens, result):
+        text_tokens = [token for token in tokens if token < self.tokenizer.eot]
+        return {
+            "seek": seek,
+            "start": start,
+            "end": end,
+            "text": self.tokenizer.decode(text_tokens),
+            "tokens": tokens,
+            "temperature": result.temperature,
+            "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio,
+            "no_speech_prob": result.no_speech_prob,
+        }
+
+    # 창 하나의 디코딩 결과를 구간으로 나누고 상태에 반영한 뒤 그 기록을 반환
+    def apply(self, state, result, segment_size):
+        seek = state["seek"]
+        if self.no_speech_threshold is not None:
+            should_skip = result.no_speech_prob > self.no_speech_threshold
+            if (
+                self.logprob_threshold is not None
+                and result.avg_logprob > self.logprob_threshold
+            ):
+                should_skip = False
+            if should_skip:
+                # 음성이 없는 창은 건너뛰지만 진행 위치는 기록
+                record = {
+                    "seek": seek + segment_size,
+                    "segments": [],
+                    "prompt_reset": False,
+                }
+                restore_window(state, record)
+                return record
+
+        tokenizer = self.tokenizer
+        tokens = list(result.tokens)
+        time_offset = float(seek * HOP_LENGTH / SAMPLE_RATE)
+        segment_duration = segment_size * HOP_LENGTH / SAMPLE_RATE
+        current_segments = []
+        is_timestamp = [token >= tokenizer.timestamp_begin for token in tokens]
+        single_timestamp_ending = is_timestamp[-2:] == [False, True]
+        consecutive = [
+            i + 1
+            for i in range(len(tokens) - 1)
+            if is_timestamp[i] and is_timestamp[i + 1]
+        ]
+        if consecutive:
+            # 타임스탬프 토큰이 연달아 나오는 곳마다 구간을 나눔
+            slices = consecutive
+            if single_timestamp_ending:
+                slices.append(len(tokens))
+
+            last_slice = 0
+            for current_slice in slices:
+                sliced_tokens = tokens[last_slice:current_slice]
+                start_timestamp_pos = sliced_tokens[0] - tokenizer.timestamp_begin
+                end_timestamp_pos = sliced_tokens[-1] - tokenizer.timestamp_begin
+                current_segments.append(
+                    self.new_segment(
+                        seek=seek,
+                        start=time_offset + start_timestamp_pos * self.time_precision,
+                        end=time_offset + end_timestamp_pos * self.time_precision,
+                        tokens=sliced_tokens,
+                        result=result,
+                    )
+                )
+                last_slice = current_slice
+
+            if single_timestamp_ending:
+                next_seek = seek + segment_size
+            else:
+                # 끝나지 않은 마지막 구간은 버리고 마지막 타임스탬프로 이동
+                last_timestamp_pos = tokens[last_slice - 1] - tokenizer.timestamp_begin
+                next_seek = seek + last_timestamp_pos * self.input_stride
+        else:
+            duration = segment_duration
+            timestamps = [
+                token for token in tokens if token >= tokenizer.timestamp_begin
+            ]
+            if timestamps and timestamps[-1] != tokenizer.timestamp_begin:
+                last_timestamp_pos = timestamps[-1] - tokenizer.timestamp_begin
+                duration = last_timestamp_pos * self.time_precision
+
+            current_segments.append(
+                self.new_segment(
+                    seek=seek,
+                    start=time_offset,
+                    end=time_offset + duration,
+                    tokens=tokens,
+                    result=result,
+                )
+            )
+            next_seek = seek + segment_size
+
+        # 길이가 0이거나 텍스트가 없는 구간은 비움
+        for segment in current_segments:
+            if segment["start"] == segment["end"] or segment["text"].strip() == "":
+                segment["text"] = ""
+                segment["tokens"] = []
+                segment["words"] = []
+
+        start_id = len(state["all_segments"])
+        record = {
+            "seek": next_seek,
+            "segments": [
+                {"id": i, **segment}
+                for i, segment in enumerate(current_segments, start=start_id)
+            ],
+            # 높은 temperature로 얻은 결과는 다음 창의 프롬프트로 쓰지 않음
+            "prompt_reset": not self.condition_on_previous_text
+            or result.temperature > 0.5,
+        }
+        restore_window(state, record)
+        return record
+
+    # 남은 창을 끝까지 하나씩 디코딩 (창마다 on_window(기록) 호출)
+    def run(self, state, mel, content_frames, on_window=None):
+        while state["seek"] < content_frames:
+            segment_size = min(N_FRAMES, content_frames - state["seek"])
+            mel_segment = self.mel_window(mel, state["seek"], segment_size)
+            prompt = state["all_tokens"][state["prompt_reset_since"] :]
+            [result] = self.decode(mel_segment[None], prompt)
+            record = self.apply(state, result, segment_size)
+            if on_window is not None:
+                on_window(record)
+
+
+def transcription_result(tokenizer, state, initial_prompt_tokens, language):
+    return dict(
+        text=tokenizer.decode(state["all_tokens"][len(initial_prompt_tokens) :]),
+        segments=state["all_segments"],
+        language=language,
+    )
+
+
+def prompt_tokens(tokenizer, initial_prompt):
+    if initial_prompt is None:
+        return []
+    return tokenizer.encode(" " + initial_prompt.strip())
+
+
+# whisper.transcribe와 같은 창 단위 디코딩 루프 (word_timestamps 제외)
+# 창 하나가 끝날 때마다 결과를 체크포인트에 기록하고, 다시 실행하면 마지막으로
+# 기록된 seek와 프롬프트 문맥(all_tokens, prompt_reset_since)을 복원해 이어서 진행합니다.
+# 중단 없이 실행한 것과 같은 결과를 돌려주며, 체크포인트 파일 삭제는 호출한 쪽에서 합니다.
+def transcribe_resumable(
+    model,
+    audio,
+    checkpoint_path,
+    key="",
+    *,
+    verbose=None,
+    temperature=DEFAULT_TEMPERATURE,
+    compression_ratio_threshold=2.4,
+    logprob_threshold=-1.0,
+    no_speech_threshold=0.6,
+    condition_on_previous_text=True,
+    initial_prompt=None,
+    **decode_options,
+):
+    if decode_options.get("word_timestamps"):
+        raise ValueError("이어서 전사하기는 word_timestamps를 지원하지 않습니다.")
+    decode_options.pop("word_timestamps", None)
+    dtype = select_dtype(model, decode_options)
+
+    # 창 단위로 자를 수 있도록 뒤에 30초 무음을 덧붙임
+    mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+    content_frames = mel.shape[-1] - N_FRAMES
+
+    checkpoint = Checkpoint(checkpoint_path, key)
+    language, windows = checkpoint.load()
+    if language is None:
+        language = decode_options.get("language")
+        if language is None:
+            if not model.is_multilingual:
+                language = "en"
+            else:
+                mel_segment = pad_or_trim(mel, N_FRAMES).to(model.device).to(dtype)
+                _, probs = model.detect_language(mel_segment)
+                language = max(probs, key=probs.get)
+        checkpoint.start(language)
+    decode_options["language"] = language
+
+    tokenizer = get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language=language,
+        task=decode_options.get("task", "transcribe"),
+    )
+    decoder = WindowDecoder(
+        model,
+        tokenizer,
+        dtype,
+        decode_options,
+        temperature,
+        compression_ratio_threshold,
+        logprob_threshold,
+        no_speech_threshold,
+        condition_on_previous_text,
+    )
+
+    # 체크포인트에 기록된 창들로 진행 상태 복원
+    initial_prompt_tokens = prompt_tokens(tokenizer, initial_prompt)
+    state = new_state(initial_prompt_tokens)
+    for window in windows:
+        restore_window(state, window)
+
+    decoder.run(state, mel, content_frames, checkpoint.append)
+    return transcription_result(tokenizer, state, initial_prompt_tokens, language)
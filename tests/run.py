@@ -1,15 +1,42 @@
 import os
 import json
-from datetime import datetime, timezone
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 import sqlite3
 from src.lib.logging_config import logger
+from tests.http_cache import ETagCachingHttp
+from tests.api_scheduler import ApiScheduler, QuotaExceeded
 from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
 from google.auth.exceptions import RefreshError
+from google_auth_httplib2 import AuthorizedHttp
 
 # 상수 정의
 TOKEN_FILE = "token.json"
 DB_FILE = "liked_videos.db"
+BULK_INSERT = True  # False로 두면 기존 행 단위 저장 경로로 비교할 수 있습니다.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,  # 음수는 KiB 단위 (약 64MB)
+    "temp_store": "MEMORY",
+}
+# 2: video_tags 테이블, duration_seconds 컬럼, 조회용 인덱스
+# 3: 제목/설명/태그와 자막 구간에 대한 FTS5 전문 검색 인덱스
+# 4: FTS 인덱스가 참조하는 명시적 INTEGER PRIMARY KEY (search_rowid)
+SCHEMA_VERSION = 4
+MIGRATION_CHUNK_SIZE = 1000  # 기존 데이터 변환 시 한 번에 처리할 행 수
+PLAYLIST_ID_TTL = timedelta(days=7)  # 좋아요 재생목록 ID 캐시 유효 기간
+USE_HTTP_CACHE = True  # ETag 기반 응답 캐시 사용 여부
+LEAN_FETCH = True  # 저장하는 컬럼에 필요한 필드만 요청 (fields 부분 응답)
+PREFETCH_DEPTH = 2  # 미리 가져올 페이지 수 (0이면 페이지를 순서대로 하나씩 처리)
+INCREMENTAL_SYNC = True  # 이미 저장된 동영상이 연속으로 나오면 페이지 탐색 중단
+KNOWN_RUN_LIMIT = 50  # 탐색을 멈추기 전까지 허용하는 연속된 기존 동영상 수
 
 # 로깅 설정
 # logging.basicConfig(level=logging.INFO)
@@ -45,6 +72,9 @@ def get_youtube_service():
                 "token_uri": "https://oauth2.googleapis.com/token",
             }
         )
+        if USE_HTTP_CACHE:
+            http = AuthorizedHttp(credentials, http=ETagCachingHttp())
+            return build("youtube", "v3", http=http)
         return build("youtube", "v3", credentials=credentials)
     except RefreshError as e:
         print(f"리프레시 토큰 오류: {e}")
@@ -55,49 +85,270 @@ def get_youtube_service():
         return None
 
 
-def get_liked_videos(youtube, max_results=50, page_token=None, published_after=None):
-    try:
-        # 좋아요 표시한 동영상 재생목록 ID 가져오기
-        channels_response = (
-            youtube.channels().list(part="contentDetails", mine=True).execute()
-        )
+# 모든 YouTube API 요청은 할당량/속도 제한/재시도를 위해 스케줄러를 거칩니다.
+api_scheduler = ApiScheduler()
 
-        likes_playlist_id = channels_response["items"][0]["contentDetails"][
-            "relatedPlaylists"
-        ]["likes"]
 
-        # 좋아요 표시한 동영상 가져오기
-        request = youtube.playlistItems().list(
-            part="snippet,contentDetails",
-            playlistId=likes_playlist_id,
-            maxResults=max_results,
-            pageToken=page_token,
-            publishedAfter=published_after,
-        )
-        response = request.execute()
+def execute_request(request):
+    return api_scheduler.execute(request)
 
-        # 동영상 세부 정보 가져오기
-        video_ids = [
-            item["contentDetails"]["videoId"] for item in response.get("items", [])
-        ]
-        videos_response = (
-            youtube.videos()
-            .list(part="snippet,contentDetails,statistics", id=",".join(video_ids))
-            .execute()
-        )
 
-        return videos_response.get("items", []), response.get("nextPageToken")
+# 좋아요 표시한 동영상 재생목록 ID 가져오기
+def fetch_likes_playlist_id(youtube):
+    channels_response = execute_request(
+        youtube.channels().list(part="contentDetails", mine=True)
+    )
+    return channels_response["items"][0]["contentDetails"]["relatedPlaylists"]["likes"]
+
+
+# metadata 테이블에 캐시된 재생목록 ID를 우선 사용하고, 만료되었을 때만 다시 조회
+def get_likes_playlist_id(youtube, conn, ttl=PLAYLIST_ID_TTL):
+    playlist_id = get_metadata(conn, "likes_playlist_id")
+    fetched_at = get_metadata(conn, "likes_playlist_id_fetched_at")
+    if playlist_id and fetched_at:
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(fetched_at)
+        if age < ttl:
+            return playlist_id
+
+    try:
+        playlist_id = fetch_likes_playlist_id(youtube)
     except Exception as e:
-        logger.error(f"좋아요 표시한 동영상을 가져오는 중 오류 발생: {e}")
-        if "invalid_grant" in str(e):
-            logger.error(
-                "리프레시 토큰이 만료되었거나 유효하지 않습니다. 새로운 토큰을 얻어야 합니다."
+        logger.error(f"좋아요 재생목록 ID를 가져오는 중 오류 발생: {e}")
+        return None
+
+    set_metadata(conn, "likes_playlist_id", playlist_id)
+    set_metadata(
+        conn,
+        "likes_playlist_id_fetched_at",
+        datetime.now(timezone.utc).isoformat(),
+    )
+    return playlist_id
+
+
+# 좋아요 재생목록의 한 페이지에서 동영상 ID 목록 가져오기
+# playlistItems.list는 publishedAfter를 무시하므로 증분 동기화는 IncrementalFilter로 처리
+def fetch_playlist_page(
+    youtube, likes_playlist_id, max_results=50, page_token=None, lean=LEAN_FETCH
+):
+    params = {
+        "part": "snippet,contentDetails",
+        "playlistId": likes_playlist_id,
+        "maxResults": max_results,
+        "pageToken": page_token,
+    }
+    if lean:
+        params["part"] = "contentDetails"
+        params["fields"] = PLAYLIST_ITEMS_FIELDS
+    response = execute_request(youtube.playlistItems().list(**params))
+    video_ids = [
+        item["contentDetails"]["videoId"] for item in response.get("items", [])
+    ]
+    return video_ids, response.get("nextPageToken")
+
+
+def video_request_params(video_ids, lean=LEAN_FETCH):
+    params = {"part": "snippet,contentDetails,statistics", "id": ",".join(video_ids)}
+    if lean:
+        params["part"] = VIDEO_PARTS
+        params["fields"] = VIDEO_FIELDS
+    return params
+
+
+# 동영상 세부 정보 가져오기
+def fetch_video_details(youtube, video_ids, lean=LEAN_FETCH):
+    if not video_ids:
+        return []
+    params = video_request_params(video_ids, lean)
+    videos_response = execute_request(youtube.videos().list(**params))
+    return videos_response.get("items", [])
+
+
+def log_fetch_error(e):
+    logger.error(f"좋아요 표시한 동영상을 가져오는 중 오류 발생: {e}")
+    if "invalid_grant" in str(e):
+        logger.error(
+            "리프레시 토큰이 만료되었거나 유효하지 않습니다. 새로운 토큰을 얻어야 합니다."
+        )
+
+
+# 최신순으로 정렬된 좋아요 재생목록에서 이미 저장된 동영상을 걸러냄
+class IncrementalFilter:
+    def __init__(self, known_ids, stop_after=KNOWN_RUN_LIMIT):
+        self.known_ids = known_ids
+        self.stop_after = stop_after
+        self.known_run = 0
+        self.exhausted = False
+
+    def filter(self, video_ids):
+        new_ids = []
+        for video_id in video_ids:
+            if video_id in self.known_ids:
+                self.known_run += 1
+                if self.known_run >= self.stop_after:
+                    self.exhausted = True
+                    break
+            else:
+                self.known_run = 0
+                new_ids.append(video_id)
+        return new_ids
+
+
+def load_known_video_ids(conn):
+    cursor = conn.execute("SELECT id FROM liked_videos")
+    return frozenset(row[0] for row in cursor)
+
+
+_PIPELINE_DONE = object()
+
+
+class _PipelineError:
+    def __init__(self, error):
+        self.error = error
+
+
+# 중단 요청을 확인하면서 제한된 큐에 넣기/꺼내기
+def _pipeline_put(out_queue, item, stop_event):
+    while not stop_event.is_set():
+        try:
+            out_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _pipeline_get(in_queue, stop_event):
+    while not stop_event.is_set():
+        try:
+            return in_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _PIPELINE_DONE
+
+
+# 1단계: playlistItems 페이지를 앞서 가져와 동영상 ID 목록을 넘김
+def _playlist_stage(
+    service_factory,
+    likes_playlist_id,
+    max_results,
+    max_pages,
+    page_token,
+    incremental_filter,
+    out_queue,
+    stop_event,
+):
+    try:
+        youtube = service_factory()
+        page_count = 0
+        while not stop_event.is_set():
+            video_ids, next_page_token = fetch_playlist_page(
+                youtube, likes_playlist_id, max_results, page_token
             )
-        return [], None
+            if incremental_filter:
+                video_ids = incremental_filter.filter(video_ids)
+            page_count += 1
+            page = (video_ids, next_page_token)
+            if not _pipeline_put(out_queue, page, stop_event):
+                return
+            page_token = next_page_token
+            if not page_token or (max_pages != 0 and page_count >= max_pages):
+                break
+            if incremental_filter and incremental_filter.exhausted:
+                break
+    except Exception as e:
+        _pipeline_put(out_queue, _PipelineError(e), stop_event)
+    finally:
+        _pipeline_put(out_queue, _PIPELINE_DONE, stop_event)
 
 
-def create_connection():
-    return sqlite3.connect(DB_FILE)
+# 2단계: videos().list로 세부 정보를 가져와 저장 단계로 넘김
+def _details_stage(service_factory, in_queue, out_queue, stop_event):
+    try:
+        youtube = service_factory()
+        while True:
+            page = _pipeline_get(in_queue, stop_event)
+            if page is _PIPELINE_DONE or isinstance(page, _PipelineError):
+                _pipeline_put(out_queue, page, stop_event)
+                return
+            video_ids, next_page_token = page
+            videos = fetch_video_details(youtube, video_ids)
+            if not _pipeline_put(out_queue, (videos, next_page_token), stop_event):
+                return
+    except Exception as e:
+        _pipeline_put(out_queue, _PipelineError(e), stop_event)
+
+
+# 좋아요 표시한 동영상을 (동영상 목록, 다음 페이지 토큰) 단위로 반환
+# prefetch_depth > 0이면 다음 페이지 요청과 세부 정보 요청이 DB 저장과 동시에 진행됩니다.
+# httplib2는 스레드 안전하지 않으므로 각 단계는 service_factory로 자신의 서비스 객체를 만듭니다.
+# known_ids를 주면 저장되지 않은 동영상만 세부 정보를 요청하고, 기존 동영상이
+# KNOWN_RUN_LIMIT개 연속으로 나오면 탐색을 멈춥니다.
+# 요청이 실패하면 예외가 호출한 쪽으로 전달되므로, 마지막으로 받은 다음 페이지 토큰에서
+# 다시 시작할 수 있습니다.
+def iter_liked_video_pages(
+    service_factory,
+    likes_playlist_id,
+    max_results=50,
+    max_pages=0,
+    known_ids=None,
+    prefetch_depth=PREFETCH_DEPTH,
+    page_token=None,
+):
+    incremental_filter = IncrementalFilter(known_ids) if known_ids else None
+
+    if prefetch_depth <= 0:
+        youtube = service_factory()
+        page_count = 0
+        while True:
+            video_ids, page_token = fetch_playlist_page(
+                youtube, likes_playlist_id, max_results, page_token
+            )
+            if incremental_filter:
+                video_ids = incremental_filter.filter(video_ids)
+            liked_videos = fetch_video_details(youtube, video_ids)
+            page_count += 1
+            yield liked_videos, page_token
+            if not page_token or (max_pages != 0 and page_count >= max_pages):
+                return
+            if incremental_filter and incremental_filter.exhausted:
+                return
+
+    id_queue = queue.Queue(maxsize=prefetch_depth)
+    video_queue = queue.Queue(maxsize=prefetch_depth)
+    stop_event = threading.Event()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        executor.submit(
+            _playlist_stage,
+            service_factory,
+            likes_playlist_id,
+            max_results,
+            max_pages,
+            page_token,
+            incremental_filter,
+            id_queue,
+            stop_event,
+        )
+        executor.submit(
+            _details_stage, service_factory, id_queue, video_queue, stop_event
+        )
+        try:
+            while True:
+                page = video_queue.get()
+                if page is _PIPELINE_DONE:
+                    break
+                if isinstance(page, _PipelineError):
+                    raise page.error
+                yield page
+        finally:
+            stop_event.set()
+
+
+def create_connection(db_file=DB_FILE):
+    conn = sqlite3.connect(db_file)
+    # WAL 모드에서는 커밋마다 fsync가 일어나지 않아 대량 저장이 빨라집니다.
+    for name, value in SQLITE_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
 
 
 def create_table(conn):
@@ -127,94 +378,554 @@ def create_table(conn):
     """
     )
     conn.commit()
+    migrate_schema(conn)
 
 
-def get_last_update_time(conn):
+# ISO-8601 재생 시간(예: PT1H2M3S, P1DT2H)을 초 단위로 변환
+ISO_DURATION_PATTERN = re.compile(
+    r"P(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?"
+)
+
+
+def parse_duration(duration):
+    match = ISO_DURATION_PATTERN.fullmatch(duration or "")
+    if not match:
+        return None
+    parts = {name: int(value or 0) for name, value in match.groupdict().items()}
+    return (
+        parts["days"] * 86400
+        + parts["hours"] * 3600
+        + parts["minutes"] * 60
+        + parts["seconds"]
+    )
+
+
+def split_tags(tags):
+    return [tag for tag in (tags or "").split(",") if tag]
+
+
+# 스키마를 SCHEMA_VERSION까지 한 단계씩 올립니다.
+def migrate_schema(conn, chunk_size=MIGRATION_CHUNK_SIZE):
+    version = int(get_metadata(conn, "schema_version") or 1)
+    if version < 2:
+        migrate_to_v2(conn, chunk_size)
+        set_metadata(conn, "schema_version", "2")
+    if version < 3:
+        migrate_to_v3(conn)
+        set_metadata(conn, "schema_version", "3")
+    if version < 4:
+        migrate_to_v4(conn)
+
+
+def create_video_indexes(conn):
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_liked_videos_published_at "
+        "ON liked_videos (published_at)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_liked_videos_channel_title "
+        "ON liked_videos (channel_title)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_liked_videos_category_id "
+        "ON liked_videos (category_id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_liked_videos_duration_seconds "
+        "ON liked_videos (duration_seconds)"
+    )
+
+
+# 기존 행은 청크 단위로 나누어 채웁니다.
+def migrate_to_v2(conn, chunk_size=MIGRATION_CHUNK_SIZE):
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(liked_videos)")]
+    with conn:
+        if "duration_seconds" not in columns:
+            conn.execute("ALTER TABLE liked_videos ADD COLUMN duration_seconds INTEGER")
+        conn.execute(
+            """
+        CREATE TABLE IF NOT EXISTS video_tags (
+            video_id TEXT NOT NULL,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (video_id, tag)
+        ) WITHOUT ROWID
+        """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_video_tags_tag ON video_tags (tag, video_id)"
+        )
+        create_video_indexes(conn)
+
+    last_rowid = 0
+    migrated = 0
+    while True:
+        rows = conn.execute(
+            "SELECT rowid, id, tags, duration FROM liked_videos "
+            "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (last_rowid, chunk_size),
+        ).fetchall()
+        if not rows:
+            break
+        with conn:
+            conn.executemany(
+                "UPDATE liked_videos SET duration_seconds = ? WHERE rowid = ?",
+                [(parse_duration(duration), rowid) for rowid, _, _, duration in rows],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO video_tags (video_id, tag) VALUES (?, ?)",
+                [
+                    (video_id, tag)
+                    for _, video_id, tags, _ in rows
+                    for tag in split_tags(tags)
+                ],
+            )
+        last_rowid = rows[-1][0]
+        migrated += len(rows)
+        logger.info(f"스키마 변환: {migrated}개 행 처리")
+
+
+# 자막 구간 검색용 FTS5 테이블을 만듭니다.
+# (liked_videos 검색 인덱스는 v4에서 search_rowid를 기준으로 만듭니다.)
+def migrate_to_v3(conn):
+    with conn:
+        conn.execute(
+            """
+        CREATE VIRTUAL TABLE IF NOT EXISTS transcript_segments_fts USING fts5(
+            text,
+            video_id UNINDEXED,
+            start_time UNINDEXED,
+            end_time UNINDEXED,
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+        )
+        conn.execute(
+            """
+        CREATE TABLE IF NOT EXISTS transcript_files (
+            path TEXT PRIMARY KEY,
+            video_id TEXT,
+            mtime REAL
+        )
+        """
+        )
+
+
+# liked_videos를 외부 콘텐츠로 쓰는 FTS5 인덱스와 동기화 트리거
+# 인덱스는 search_rowid(INTEGER PRIMARY KEY)로 행을 찾으므로 VACUUM에도 어긋나지 않습니다.
+def create_video_search_index(conn):
+    conn.execute(
+        """
+    CREATE VIRTUAL TABLE IF NOT EXISTS liked_videos_fts USING fts5(
+        title,
+        description,
+        tags,
+        content='liked_videos',
+        content_rowid='search_rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """
+    )
+    conn.execute(
+        """
+    CREATE TRIGGER IF NOT EXISTS liked_videos_fts_insert
+    AFTER INSERT ON liked_videos BEGIN
+        INSERT INTO liked_videos_fts (rowid, title, description, tags)
+        VALUES (new.search_rowid, new.title, new.description, new.tags);
+    END
+    """
+    )
+    conn.execute(
+        """
+    CREATE TRIGGER IF NOT EXISTS liked_videos_fts_delete
+    AFTER DELETE ON liked_videos BEGIN
+        INSERT INTO liked_videos_fts (liked_videos_fts, rowid, title, description, tags)
+        VALUES ('delete', old.search_rowid, old.title, old.description, old.tags);
+    END
+    """
+    )
+    conn.execute(
+        """
+    CREATE TRIGGER IF NOT EXISTS liked_videos_fts_update
+    AFTER UPDATE OF title, description, tags ON liked_videos BEGIN
+        INSERT INTO liked_videos_fts (liked_videos_fts, rowid, title, description, tags)
+        VALUES ('delete', old.search_rowid, old.title, old.description, old.tags);
+        INSERT INTO liked_videos_fts (rowid, title, description, tags)
+        VALUES (new.search_rowid, new.title, new.description, new.tags);
+    END
+    """
+    )
+    conn.execute("INSERT INTO liked_videos_fts (liked_videos_fts) VALUES ('rebuild')")
+
+
+# liked_videos의 암묵적 rowid는 VACUUM 때 다시 매겨질 수 있으므로, 기존 rowid를
+# 명시적 INTEGER PRIMARY KEY(search_rowid)로 옮긴 테이블로 다시 만들고
+# 검색 인덱스를 그 키 기준으로 새로 만듭니다. (컬럼 순서는 그대로, 새 키는 맨 뒤)
+# sqlite3 모듈은 DDL을 바로 커밋하므로, 중간에 실패해도 원래 상태로 돌아가도록
+# 버전 기록까지 한 번의 명시적 트랜잭션(BEGIN IMMEDIATE)으로 실행합니다.
+def migrate_to_v4(conn):
+    columns = [
+        "id",
+        "title",
+        "description",
+        "published_at",
+        "channel_title",
+        "thumbnail_url",
+        "tags",
+        "category_id",
+        "video_url",
+        "duration",
+        "duration_seconds",
+    ]
+    conn.commit()
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        # 잠금을 기다리는 동안 다른 프로세스가 먼저 변환했을 수 있음
+        if int(get_metadata(conn, "schema_version") or 1) >= 4:
+            conn.execute("ROLLBACK")
+            return
+        for trigger in ("insert", "delete", "update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS liked_videos_fts_{trigger}")
+        conn.execute("DROP TABLE IF EXISTS liked_videos_fts")
+        conn.execute(
+            """
+        CREATE TABLE liked_videos_v4 (
+            id TEXT NOT NULL UNIQUE,
+            title TEXT,
+            description TEXT,
+            published_at TEXT,
+            channel_title TEXT,
+            thumbnail_url TEXT,
+            tags TEXT,
+            category_id TEXT,
+            video_url TEXT,
+            duration TEXT,
+            duration_seconds INTEGER,
+            search_rowid INTEGER PRIMARY KEY
+        )
+        """
+        )
+        conn.execute(
+            f"INSERT INTO liked_videos_v4 ({', '.join(columns)}, search_rowid) "
+            f"SELECT {', '.join(columns)}, rowid FROM liked_videos"
+        )
+        conn.execute("DROP TABLE liked_videos")
+        conn.execute("ALTER TABLE liked_videos_v4 RENAME TO liked_videos")
+        create_video_indexes(conn)
+        create_video_search_index(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO metadata (key, value) VALUES ('schema_version', '4')"
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.isolation_level = isolation_level
+
+
+def get_metadata(conn, key):
     cursor = conn.cursor()
-    cursor.execute("SELECT value FROM metadata WHERE key = 'last_update_time'")
+    cursor.execute("SELECT value FROM metadata WHERE key = ?", (key,))
     result = cursor.fetchone()
     return result[0] if result else None
 
 
-def update_last_update_time(conn, time):
+def set_metadata(conn, key, value):
     cursor = conn.cursor()
     cursor.execute(
         "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
-        ("last_update_time", time),
+        (key, value),
     )
     conn.commit()
 
 
+# YouTube API 할당량은 태평양 표준시 자정에 초기화됩니다.
+def quota_usage_key():
+    today = datetime.now(ZoneInfo("America/Los_Angeles")).date()
+    return f"quota_used:{today.isoformat()}"
+
+
+def get_last_update_time(conn):
+    return get_metadata(conn, "last_update_time")
+
+
+def update_last_update_time(conn, time):
+    set_metadata(conn, "last_update_time", time)
+
+
+# liked_videos 컬럼별로 필요한 API 필드와 값을 만드는 방법
+# (컬럼 이름, videos.list 필드 경로, 변환 함수)
+VIDEO_COLUMNS = [
+    ("id", "id", lambda video: video["id"]),
+    ("title", "snippet/title", lambda video: video["snippet"]["title"]),
+    (
+        "description",
+        "snippet/description",
+        lambda video: video["snippet"]["description"],
+    ),
+    (
+        "published_at",
+        "snippet/publishedAt",
+        lambda video: video["snippet"]["publishedAt"],
+    ),
+    (
+        "channel_title",
+        "snippet/channelTitle",
+        lambda video: video["snippet"]["channelTitle"],
+    ),
+    (
+        "thumbnail_url",
+        "snippet/thumbnails/medium/url",
+        lambda video: video["snippet"]["thumbnails"]["medium"]["url"],
+    ),
+    (
+        "tags",
+        "snippet/tags",
+        lambda video: ",".join(video["snippet"].get("tags", [])),
+    ),
+    ("category_id", "snippet/categoryId", lambda video: video["snippet"]["categoryId"]),
+    (
+        "video_url",
+        "id",
+        lambda video: f"https://www.youtube.com/watch?v={video['id']}",
+    ),
+    (
+        "duration",
+        "contentDetails/duration",
+        lambda video: video["contentDetails"]["duration"],
+    ),
+    (
+        "duration_seconds",
+        "contentDetails/duration",
+        lambda video: parse_duration(video["contentDetails"]["duration"]),
+    ),
+]
+
+
+# 필드 경로 목록을 YouTube API의 fields 문법으로 변환
+# 예: ["id", "snippet/title", "snippet/tags"] -> "id,snippet(title,tags)"
+def build_fields_mask(paths):
+    tree = {}
+    for path in paths:
+        node = tree
+        for name in path.split("/"):
+            node = node.setdefault(name, {})
+
+    def render(node):
+        parts = []
+        for name, child in node.items():
+            if not child:
+                parts.append(name)
+            elif len(child) == 1:
+                parts.append(f"{name}/{render(child)}")
+            else:
+                parts.append(f"{name}({render(child)})")
+        return ",".join(parts)
+
+    return render(tree)
+
+
+VIDEO_PARTS = ",".join(
+    sorted({path.split("/")[0] for _, path, _ in VIDEO_COLUMNS} - {"id"})
+)
+VIDEO_FIELDS = f"items({build_fields_mask(path for _, path, _ in VIDEO_COLUMNS)})"
+PLAYLIST_ITEMS_FIELDS = "nextPageToken,items/contentDetails/videoId"
+
+# 이미 있는 동영상은 행을 지우지 않고 갱신하므로 search_rowid가 유지되고,
+# 검색 인덱스는 UPDATE 트리거로 동기화됩니다. (recursive_triggers 설정과 무관)
+INSERT_VIDEO_SQL = f"""
+    INSERT INTO liked_videos
+    ({", ".join(column for column, _, _ in VIDEO_COLUMNS)})
+    VALUES ({", ".join("?" for _ in VIDEO_COLUMNS)})
+    ON CONFLICT (id) DO UPDATE SET
+    {", ".join(f"{column} = excluded.{column}" for column, _, _ in VIDEO_COLUMNS[1:])}
+    """
+
+
+def video_to_row(video):
+    return tuple(to_value(video) for _, _, to_value in VIDEO_COLUMNS)
+
+
+# video_tags 테이블의 태그를 API 응답 기준으로 교체
+def replace_video_tags(conn, videos):
+    conn.executemany(
+        "DELETE FROM video_tags WHERE video_id = ?",
+        [(video["id"],) for video in videos],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO video_tags (video_id, tag) VALUES (?, ?)",
+        [
+            (video["id"], tag)
+            for video in videos
+            for tag in video["snippet"].get("tags", [])
+        ],
+    )
+
+
 def insert_video(conn, video):
     cursor = conn.cursor()
-    cursor.execute(
-        """
-    INSERT OR REPLACE INTO liked_videos
-    (id, title, description, published_at, channel_title, thumbnail_url, tags, category_id, video_url, duration)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """,
-        (
-            video["id"],
-            video["snippet"]["title"],
-            video["snippet"]["description"],
-            video["snippet"]["publishedAt"],
-            video["snippet"]["channelTitle"],
-            video["snippet"]["thumbnails"]["medium"]["url"],
-            ",".join(video["snippet"].get("tags", [])),
-            video["snippet"]["categoryId"],
-            f"https://www.youtube.com/watch?v={video['id']}",
-            video["contentDetails"]["duration"],
-        ),
-    )
+    cursor.execute(INSERT_VIDEO_SQL, video_to_row(video))
+    replace_video_tags(conn, [video])
     conn.commit()
 
 
-def main():
+# 한 페이지의 동영상을 하나의 트랜잭션으로 저장
+def insert_videos(conn, videos):
+    if not videos:
+        return 0
+    rows = [video_to_row(video) for video in videos]
+    with conn:
+        conn.executemany(INSERT_VIDEO_SQL, rows)
+        replace_video_tags(conn, videos)
+    return len(rows)
+
+
+# 인덱스를 이용해 조건에 맞는 좋아요 표시한 동영상 조회
+# 예: find_liked_videos(conn, max_seconds=600, tag="python", channel_title="채널")
+def find_liked_videos(
+    conn, max_seconds=None, tag=None, channel_title=None, category_id=None
+):
+    query = "SELECT v.* FROM liked_videos v"
+    conditions = []
+    params = []
+    if tag is not None:
+        query += " JOIN video_tags t ON t.video_id = v.id AND t.tag = ?"
+        params.append(tag)
+    if max_seconds is not None:
+        conditions.append("v.duration_seconds < ?")
+        params.append(max_seconds)
+    if channel_title is not None:
+        conditions.append("v.channel_title = ?")
+        params.append(channel_title)
+    if category_id is not None:
+        conditions.append("v.category_id = ?")
+        params.append(category_id)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY v.published_at"
+    return conn.execute(query, params).fetchall()
+
+
+# 좋아요 표시한 동영상을 가져와 저장하고 동기화 통계를 반환합니다.
+# 서비스 객체를 만들 수 없거나 동기화가 중간에 실패하면 None을 반환합니다.
+def sync_liked_videos(
+    conn,
+    service_factory=get_youtube_service,
+    max_results=50,
+    max_pages=0,
+    prefetch_depth=PREFETCH_DEPTH,
+    bulk_insert=BULK_INSERT,
+    incremental=INCREMENTAL_SYNC,
+):
     # YouTube 서비스 객체 얻기
-    youtube = get_youtube_service()
+    youtube = service_factory()
     if not youtube:
-        return
+        return None
 
-    with create_connection() as conn:
-        create_table(conn)
+    last_update_time = get_last_update_time(conn)
+    if last_update_time:
+        logger.info(f"마지막 업데이트 시간: {last_update_time}")
+    else:
+        logger.info("첫 실행입니다. 모든 동영상을 가져옵니다.")
 
-        last_update_time = get_last_update_time(conn)
-        if last_update_time:
-            logger.info(f"마지막 업데이트 시간: {last_update_time}")
-        else:
-            logger.info("첫 실행입니다. 모든 동영상을 가져옵니다.")
+    api_scheduler.used = int(get_metadata(conn, quota_usage_key()) or 0)
 
-        all_liked_videos = []
-        next_page_token = None
-        max_results = 50  # 한 번에 가져올 최대 동영상 수
-        max_pages = 0  # 모든 페이지 가져오기
+    # 재생목록 ID는 동기화마다 한 번만 확인합니다.
+    likes_playlist_id = get_likes_playlist_id(youtube, conn)
+    if not likes_playlist_id:
+        return None
 
-        page_count = 0
-        while True:
-            liked_videos, next_page_token = get_liked_videos(
-                youtube, max_results, next_page_token, last_update_time
-            )
-            for video in liked_videos:
-                insert_video(conn, video)
+    # 완료된 동기화가 있으면 저장된 동영상 ID로 증분 동기화를 진행합니다.
+    known_ids = None
+    if incremental and last_update_time:
+        known_ids = load_known_video_ids(conn)
+        logger.info(f"저장된 동영상 {len(known_ids)}개를 기준으로 증분 동기화합니다.")
+
+    # 이전 실행이 중간에 멈췄다면 저장된 페이지 토큰부터 이어서 가져옵니다.
+    resume_page_token = get_metadata(conn, "resume_page_token")
+    if resume_page_token:
+        logger.info(f"이전 동기화를 이어서 진행합니다: {resume_page_token}")
+
+    all_liked_videos = []
+    page_count = 0
+    write_seconds = 0.0
+    sync_completed = False
+    pages = iter_liked_video_pages(
+        service_factory,
+        likes_playlist_id,
+        max_results,
+        max_pages,
+        known_ids,
+        prefetch_depth,
+        page_token=resume_page_token,
+    )
+    try:
+        for liked_videos, next_page_token in pages:
+            write_start = time.perf_counter()
+            if bulk_insert:
+                insert_videos(conn, liked_videos)
+            else:
+                for video in liked_videos:
+                    insert_video(conn, video)
+            write_seconds += time.perf_counter() - write_start
             all_liked_videos.extend(liked_videos)
             page_count += 1
+            resume_page_token = next_page_token
 
             logger.info(
                 f"페이지 {page_count}: {len(liked_videos)}개의 동영상을 가져와 저장했습니다."
             )
+        sync_completed = True
+    except QuotaExceeded as e:
+        logger.error(f"{e}. 다음 실행에서 이어서 진행합니다.")
+    except Exception as e:
+        log_fetch_error(e)
+    finally:
+        set_metadata(conn, quota_usage_key(), str(api_scheduler.used))
+        logger.info(
+            f"API 사용량: {api_scheduler.used} 단위, 호출 수 {api_scheduler.calls}"
+        )
 
-            if not next_page_token or (max_pages != 0 and page_count >= max_pages):
-                break
+    if not sync_completed:
+        set_metadata(conn, "resume_page_token", resume_page_token)
+        return None
+    set_metadata(conn, "resume_page_token", None)
 
-        if all_liked_videos:
+    if all_liked_videos:
+        logger.info(
+            f"총 {len(all_liked_videos)}개의 새로운 좋아요 표시한 동영상을 찾아 저장했습니다."
+        )
+        if write_seconds > 0:
             logger.info(
-                f"총 {len(all_liked_videos)}개의 새로운 좋아요 표시한 동영상을 찾아 저장했습니다."
+                f"DB 저장 속도 ({'일괄' if bulk_insert else '행 단위'}): "
+                f"{len(all_liked_videos) / write_seconds:.0f} rows/sec "
+                f"({write_seconds:.3f}초)"
             )
 
-            # 마지막 업데이트 시간 저장
-            current_time = datetime.now(timezone.utc).isoformat()
-            update_last_update_time(conn, current_time)
+        # 마지막 업데이트 시간 저장
+        current_time = datetime.now(timezone.utc).isoformat()
+        update_last_update_time(conn, current_time)
+
+    return {
+        "videos": all_liked_videos,
+        "pages": page_count,
+        "write_seconds": write_seconds,
+    }
+
+
+def main():
+    with create_connection() as conn:
+        create_table(conn)
+
+        result = sync_liked_videos(conn)
+        if result is None:
+            return
 
+        if result["videos"]:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT * FROM liked_videos ORDER BY published_at ASC LIMIT 5"
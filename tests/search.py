@@ -0,0 +1,214 @@
+import glob
+import json
+import os
+import re
+
+from tests.run import DB_FILE, create_connection, create_table
+from tests.transcript_cache import CACHE_DIR, MANIFEST_FILE
+from tests.transcript_format import FILE_EXTENSION, TranscriptReader
+
+# 상수 정의
+# transcribe_audio의 내용 기반 캐시 (다른 폴더는 index_transcripts에 직접 지정)
+TRANSCRIPT_FOLDERS = [CACHE_DIR]
+SEARCH_LIMIT = 20
+# yt-dlp 기본 파일 이름 "제목 [동영상 ID]"의 ID
+BRACKETED_VIDEO_ID = re.compile(r"\[([A-Za-z0-9_-]{11})\]$")
+
+
+# 자막 파일의 동영상 ID (liked_videos에 있는 ID로 확인되지 않으면 None)
+# create_json: {VIDEO_ID}.json, 내용 기반 캐시: {해시}.wtr (원래 파일 이름은
+# manifest의 source 항목). 이름 기반 캐시 {base_name}_transcript.json의 이름은
+# 동영상 ID가 아니므로 색인하지 않습니다.
+def transcript_video_id(conn, path, sources=None):
+    base_name = os.path.splitext(os.path.basename(path))[0]
+    if base_name.endswith("_transcript"):
+        return None
+    name = (sources or {}).get(base_name, base_name)
+    candidates = [name]
+    match = BRACKETED_VIDEO_ID.search(name)
+    if match:
+        candidates.append(match.group(1))
+    for candidate in candidates:
+        row = conn.execute(
+            "SELECT 1 FROM liked_videos WHERE id = ?", (candidate,)
+        ).fetchone()
+        if row:
+            return candidate
+    return None
+
+
+# 전사 캐시 manifest에서 캐시 키 -> 원래 파일 이름 읽기
+def load_cache_sources(folder):
+    try:
+        with open(os.path.join(folder, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return {
+        key: entry["source"] for key, entry in manifest.items() if entry.get("source")
+    }
+
+
+# 자막 JSON 또는 바이너리 전사 파일에서 (시작, 끝, 텍스트) 구간 읽기
+def load_transcript_segments(path):
+    if path.endswith(FILE_EXTENSION):
+        # 시작/끝 열과 텍스트만 읽고 토큰 등 나머지 필드는 건드리지 않습니다.
+        with TranscriptReader(path) as reader:
+            starts = reader.columns["start"].tolist()
+            ends = reader.columns["end"].tolist()
+            texts = [reader.text(i).strip() for i in range(len(reader))]
+        return [(s, e, t) for s, e, t in zip(starts, ends, texts) if t]
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        return None
+    segments = []
+    for segment in data:
+        if not isinstance(segment, dict) or "start" not in segment:
+            return None
+        text = segment.get("text", segment.get("content", "")).strip()
+        if text:
+            segments.append((segment["start"], segment["end"], text))
+    return segments
+
+
+# 변경된 자막 파일만 다시 읽어 transcript_segments_fts를 갱신하고,
+# 사라졌거나 동영상 ID를 확인할 수 없는 파일의 색인은 지움
+def index_transcripts(conn, folders=TRANSCRIPT_FOLDERS):
+    indexed = 0
+    current = {}  # 경로 -> 동영상 ID
+    for folder in folders:
+        sources = load_cache_sources(folder)
+        paths = glob.glob(os.path.join(folder, "*.json"))
+        paths += glob.glob(os.path.join(folder, f"*{FILE_EXTENSION}"))
+        for path in paths:
+            video_id = transcript_video_id(conn, path, sources)
+            if video_id is None:
+                continue
+            current[path] = video_id
+            mtime = os.path.getmtime(path)
+            row = conn.execute(
+                "SELECT mtime, video_id FROM transcript_files WHERE path = ?", (path,)
+            ).fetchone()
+            if row and row == (mtime, video_id):
+                continue
+
+            try:
+                segments = load_transcript_segments(path)
+            except (OSError, ValueError):
+                segments = None
+            if segments is None:
+                del current[path]
+                continue
+
+            with conn:
+                conn.execute(
+                    "DELETE FROM transcript_segments_fts WHERE video_id = ?",
+                    (video_id,),
+                )
+                conn.executemany(
+                    "INSERT INTO transcript_segments_fts "
+                    "(text, video_id, start_time, end_time) VALUES (?, ?, ?, ?)",
+                    [(text, video_id, start, end) for start, end, text in segments],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO transcript_files (path, video_id, mtime) "
+                    "VALUES (?, ?, ?)",
+                    (path, video_id, mtime),
+                )
+            indexed += 1
+
+    scanned = {os.path.normpath(folder) for folder in folders}
+    stale = [
+        (path, video_id)
+        for path, video_id in conn.execute(
+            "SELECT path, video_id FROM transcript_files"
+        ).fetchall()
+        if os.path.normpath(os.path.dirname(path)) in scanned and path not in current
+    ]
+    with conn:
+        for path, video_id in stale:
+            conn.execute("DELETE FROM transcript_files WHERE path = ?", (path,))
+            # 같은 동영상의 다른 자막 파일이 색인되어 있으면 구간은 남김
+            if video_id not in current.values():
+                conn.execute(
+                    "DELETE FROM transcript_segments_fts WHERE video_id = ?",
+                    (video_id,),
+                )
+    return indexed
+
+
+# 입력한 단어를 각각 FTS5 문자열로 감싸 MATCH 문법(+, -, ", 연산자 등)으로 해석되지 않게 함
+# 단어 사이는 암묵적 AND입니다.
+def fts_query(query):
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+# 제목/설명/태그 검색 (bm25 순위, 일치 부분 스니펫 포함)
+def search_videos(conn, query, limit=SEARCH_LIMIT):
+    return conn.execute(
+        """
+    SELECT v.id, v.title, v.channel_title, v.video_url,
+           snippet(liked_videos_fts, -1, '[', ']', '...', 12) AS snippet
+    FROM liked_videos_fts
+    JOIN liked_videos v ON v.search_rowid = liked_videos_fts.rowid
+    WHERE liked_videos_fts MATCH ?
+    ORDER BY bm25(liked_videos_fts, 10.0, 1.0, 5.0)
+    LIMIT ?
+    """,
+        (fts_query(query), limit),
+    ).fetchall()
+
+
+# 자막 구간 검색 (일치한 구간의 시작 시간 포함)
+def search_transcripts(conn, query, limit=SEARCH_LIMIT):
+    return conn.execute(
+        """
+    SELECT f.video_id, v.title, f.start_time, f.end_time,
+           snippet(transcript_segments_fts, 0, '[', ']', '...', 12) AS snippet
+    FROM transcript_segments_fts f
+    LEFT JOIN liked_videos v ON v.id = f.video_id
+    WHERE transcript_segments_fts MATCH ?
+    ORDER BY rank
+    LIMIT ?
+    """,
+        (fts_query(query), limit),
+    ).fetchall()
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def main():
+    conn = create_connection(DB_FILE)
+    create_table(conn)
+
+    indexed = index_transcripts(conn)
+    if indexed:
+        print(f"자막 파일 {indexed}개를 색인했습니다.")
+
+    query = input("검색어를 입력하세요: ").strip()
+    if not query:
+        return
+
+    print("\n동영상 검색 결과:")
+    for video_id, title, channel_title, video_url, snippet in search_videos(
+        conn, query
+    ):
+        print(f"{title} ({channel_title}) - {video_url}")
+        print(f"  {snippet}")
+
+    print("\n자막 검색 결과:")
+    for video_id, title, start, end, snippet in search_transcripts(conn, query):
+        link = f"https://www.youtube.com/watch?v={video_id}&t={int(start)}s"
+        print(f"[{format_timestamp(start)}] {title or video_id} - {link}")
+        print(f"  {snippet}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
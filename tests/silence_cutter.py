@@ -0,0 +1,300 @@
+import bisect
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import srt
+
+from tests.audio_decoder import probe_duration
+
+# 상수 정의
+PADDING_SECONDS = 0.2  # 자막 구간 앞뒤로 남겨 둘 여유
+MERGE_GAP_SECONDS = 0.5  # 여유를 더한 뒤 이보다 가까운 구간은 하나로 합침
+# 구간 시작을 직전 키프레임으로 당길 수 있는 최대 거리
+# 이보다 멀면 무음이 너무 많이 남으므로 스트림 복사 대신 다시 인코딩합니다.
+MAX_SNAP_SECONDS = 2.0
+ENCODE_WORKERS = max(1, (os.cpu_count() or 2) // 2)  # 동시에 인코딩할 구간 수
+VIDEO_ENCODE_ARGS = ["-c:v", "libx264", "-preset", "veryfast", "-crf", "20"]
+AUDIO_ENCODE_ARGS = ["-c:a", "aac", "-b:a", "160k"]
+BENCH_SUBTITLE_COUNTS = [10, 100, 400]
+
+
+def run_ffmpeg(args, error_message):
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *args],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise Exception(f"{error_message}: {result.stderr[-500:]}")
+
+
+# SRT 자막의 (시작, 끝) 시간 목록 (초)
+def subtitle_intervals(srt_path):
+    with open(srt_path, "r", encoding="utf-8") as f:
+        return [
+            (sub.start.total_seconds(), sub.end.total_seconds()) for sub in srt.parse(f)
+        ]
+
+
+# 앞뒤로 padding을 더하고, 겹치거나 merge_gap 이내로 붙은 구간은 하나로 합침
+def merge_intervals(intervals, padding=PADDING_SECONDS, merge_gap=MERGE_GAP_SECONDS):
+    merged = []
+    for start, end in sorted(intervals):
+        start, end = max(0.0, start - padding), end + padding
+        if merged and start - merged[-1][1] <= merge_gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(interval) for interval in merged]
+
+
+# 첫 비디오 스트림의 키프레임 시각 목록 (디코딩 없이 패킷 플래그만 읽음)
+# ffprobe가 실패하면 None, 비디오 스트림이 없으면 빈 목록을 반환합니다.
+def probe_keyframes(video_path):
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=p=0",
+            video_path,
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.strip().partition(",")
+        if "K" in flags and pts_time not in ("", "N/A"):
+            keyframes.append(float(pts_time))
+    return sorted(keyframes)
+
+
+# 스트림 복사는 키프레임에서만 시작할 수 있으므로 각 구간의 시작을 직전 키프레임으로
+# 당기고, 당긴 뒤 겹치는 구간은 다시 합칩니다. 끝은 키프레임이 아니어도 됩니다.
+# 어느 구간이든 max_snap보다 멀리 당겨야 하면 None (전체를 다시 인코딩)
+def keyframe_cut_points(intervals, keyframes, max_snap=MAX_SNAP_SECONDS):
+    if keyframes is None:
+        return None
+    if not keyframes:
+        return list(intervals)
+    cuts = []
+    for start, end in intervals:
+        # pts_time 출력의 반올림 오차 때문에 키프레임 바로 위의 시작은 그 키프레임으로
+        index = bisect.bisect_right(keyframes, start + 1e-3) - 1
+        keyframe = keyframes[index] if index >= 0 else 0.0
+        if start - keyframe > max_snap:
+            return None
+        if cuts and keyframe <= cuts[-1][1]:
+            cuts[-1] = (cuts[-1][0], max(cuts[-1][1], end))
+        else:
+            cuts.append((keyframe, end))
+    return cuts
+
+
+# concat demuxer 목록 파일 기록 (entries: (파일, inpoint 또는 None, outpoint 또는 None))
+def write_concat_list(list_path, entries):
+    with open(list_path, "w", encoding="utf-8") as f:
+        for file_path, inpoint, outpoint in entries:
+            escaped = os.path.abspath(file_path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+            if inpoint is not None:
+                f.write(f"inpoint {inpoint:.6f}\n")
+            if outpoint is not None:
+                f.write(f"outpoint {outpoint:.6f}\n")
+
+
+def concat_copy(list_path, output_path):
+    run_ffmpeg(
+        [
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+            "-map",
+            "0:v?",
+            "-map",
+            "0:a?",
+            "-c",
+            "copy",
+            "-avoid_negative_ts",
+            "make_zero",
+            output_path,
+        ],
+        "구간 이어 붙이기 실패",
+    )
+
+
+def encode_segment(video_path, start, end, segment_path, threads):
+    run_ffmpeg(
+        [
+            "-ss",
+            f"{start:.6f}",
+            "-i",
+            video_path,
+            "-t",
+            f"{end - start:.6f}",
+            "-map",
+            "0:v?",
+            "-map",
+            "0:a?",
+            *VIDEO_ENCODE_ARGS,
+            *AUDIO_ENCODE_ARGS,
+            "-threads",
+            str(threads),
+            segment_path,
+        ],
+        f"구간 인코딩 실패 ({start:.2f}~{end:.2f}초)",
+    )
+
+
+# 구간마다 따로 (여러 개를 동시에) 인코딩한 뒤 스트림 복사로 이어 붙임
+# 키프레임과 상관없이 정확한 시각에서 자를 수 있습니다.
+def encode_intervals(video_path, intervals, temp_dir, output_path, workers):
+    workers = max(1, min(workers, len(intervals)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    segment_paths = [
+        os.path.join(temp_dir, f"segment{i:05d}.mp4") for i in range(len(intervals))
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(encode_segment, video_path, start, end, path, threads)
+            for (start, end), path in zip(intervals, segment_paths)
+        ]
+        for future in futures:
+            future.result()
+
+    list_path = os.path.join(temp_dir, "segments.txt")
+    write_concat_list(list_path, [(path, None, None) for path in segment_paths])
+    concat_copy(list_path, output_path)
+
+
+# 자막 구간만 남긴 비디오 생성
+# 키프레임에 맞출 수 있으면 원본을 다시 인코딩하지 않고 concat demuxer로 복사하며,
+# 그렇지 않거나 복사에 실패하면 구간별 병렬 인코딩으로 만듭니다.
+# 결과는 임시 파일에 만든 뒤 교체합니다. 반환값: "copy" 또는 "encode"
+def remove_silence(
+    video_path,
+    intervals,
+    output_path,
+    padding=PADDING_SECONDS,
+    merge_gap=MERGE_GAP_SECONDS,
+    max_snap=MAX_SNAP_SECONDS,
+    workers=ENCODE_WORKERS,
+):
+    intervals = merge_intervals(intervals, padding, merge_gap)
+    if not intervals:
+        raise Exception("남길 자막 구간이 없습니다")
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    with tempfile.TemporaryDirectory(dir=output_dir) as temp_dir:
+        temp_output = os.path.join(
+            temp_dir, "output" + os.path.splitext(output_path)[1]
+        )
+        cuts = keyframe_cut_points(intervals, probe_keyframes(video_path), max_snap)
+        mode = "copy"
+        if cuts is not None:
+            list_path = os.path.join(temp_dir, "cuts.txt")
+            write_concat_list(
+                list_path, [(video_path, start, end) for start, end in cuts]
+            )
+            try:
+                concat_copy(list_path, temp_output)
+            except Exception as e:
+                print(f"스트림 복사 실패, 구간별로 다시 인코딩합니다: {e}")
+                cuts = None
+        if cuts is None:
+            mode = "encode"
+            encode_intervals(video_path, intervals, temp_dir, temp_output, workers)
+        os.replace(temp_output, output_path)
+    return mode
+
+
+# 기존 방식: 자막마다 between(t,..) 항을 하나씩 넣은 select/aselect 필터로 전체를 다시 인코딩
+# 모든 프레임에서 모든 항을 계산하므로 비교용으로만 남겨 둡니다.
+def cut_with_select_filter(video_path, intervals, output_path):
+    expression = "+".join(f"between(t,{start},{end})" for start, end in intervals)
+    run_ffmpeg(
+        [
+            "-i",
+            video_path,
+            "-vf",
+            f"select='{expression}',setpts=N/FRAME_RATE/TB",
+            "-af",
+            f"aselect='{expression}',asetpts=N/SR/TB",
+            output_path,
+        ],
+        "무음 구간 제거 실패",
+    )
+
+
+# 말소리가 있는 것처럼 count개의 구간을 고르게 흩어 놓은 합성 자막
+def synthetic_intervals(duration, count, seed=0):
+    rng = random.Random(seed)
+    slot = duration / count
+    intervals = []
+    for i in range(count):
+        start = i * slot + rng.uniform(0, 0.3) * slot
+        intervals.append((start, start + rng.uniform(0.4, 0.7) * slot))
+    return intervals
+
+
+# 자막 수를 늘려 가며 기존 select 필터 방식과 새 방식의 시간을 비교
+def main():
+    if len(sys.argv) < 2:
+        print(
+            "사용법: python -m tests.silence_cutter <비디오 파일> "
+            "[--srt 자막.srt] [--subtitles 10,100,400]"
+        )
+        return
+    args = sys.argv[1:]
+    video_path = args[0]
+    duration = probe_duration(video_path)
+    if "--srt" in args:
+        cases = {"srt": subtitle_intervals(args[args.index("--srt") + 1])}
+    else:
+        counts = BENCH_SUBTITLE_COUNTS
+        if "--subtitles" in args:
+            counts = [int(c) for c in args[args.index("--subtitles") + 1].split(",")]
+        cases = {f"자막 {c}개": synthetic_intervals(duration, c) for c in counts}
+
+    extension = os.path.splitext(video_path)[1]
+    print(f"입력 길이 {duration:.0f}초")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, intervals in cases.items():
+            filter_path = os.path.join(temp_dir, f"filter{extension}")
+            start = time.perf_counter()
+            cut_with_select_filter(video_path, intervals, filter_path)
+            filter_seconds = time.perf_counter() - start
+
+            cut_path = os.path.join(temp_dir, f"cut{extension}")
+            start = time.perf_counter()
+            mode = remove_silence(video_path, intervals, cut_path)
+            cut_seconds = time.perf_counter() - start
+
+            print(
+                f"{name}: select 필터 {filter_seconds:.2f}초 "
+                f"(결과 {probe_duration(filter_path):.1f}초), "
+                f"{mode} {cut_seconds:.2f}초 "
+                f"(결과 {probe_duration(cut_path):.1f}초, 구간 "
+                f"{len(merge_intervals(intervals))}개), "
+                f"{filter_seconds / cut_seconds:.1f}배"
+            )
+
+
+if __name__ == "__main__":
+    main()
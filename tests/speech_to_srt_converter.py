@@ -1,13 +1,22 @@
 import os
 import subprocess
 import warnings
-import whisper
-import srt
+import sys
+
+# python tests/파일.py처럼 직접 실행할 때도 tests 패키지를 찾도록 저장소 루트를 추가
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests import whisper_server
 import logging
-from typing import List, Dict
+from typing import List, Dict, Union
 from urllib.parse import urlparse, parse_qs
 import glob
-import json
+import queue
+import threading
+import time
+import numpy as np
+from tests.audio_decoder import decode_audio, stream_youtube_audio
+from tests.subtitle_writer import write_subtitles
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
@@ -15,6 +24,19 @@ warnings.filterwarnings("ignore", category=UserWarning)
 
 # 상수 정의
 VIDEO_URL = "https://www.youtube.com/watch?v=l2hsDu1Rf2A"
+VIDEO_URLS = [VIDEO_URL]  # 여러 개면 단계별 파이프라인으로 동시에 처리
+PCM_EXTRACTION = True  # MP3 파일 대신 메모리의 16kHz PCM으로 바로 디코딩
+AUDIO_ONLY = True  # 비디오 없이 가장 작은 오디오 스트림만 받아 바로 디코딩
+WRITE_VTT = False  # SRT / JSON과 함께 WebVTT 자막도 생성
+# base로 전체를 전사하고 신뢰도가 낮은 범위만 큰 모델로 다시 전사
+TIERED = False
+
+# 파이프라인 단계별 동시 실행 수와 단계 사이 큐 크기
+DOWNLOAD_WORKERS = 2
+EXTRACT_WORKERS = 2
+TRANSCRIBE_WORKERS = 1
+OUTPUT_WORKERS = 1
+STAGE_QUEUE_SIZE = 2
 
 
 # URL에서 비디오 ID 추출
@@ -27,6 +49,7 @@ VIDEO_ID = get_video_id(VIDEO_URL)
 VIDEO_PATH = f"{VIDEO_ID}"  # 확장자 제거
 AUDIO_PATH = f"{VIDEO_ID}.mp3"
 SRT_PATH = f"{VIDEO_ID}.srt"
+AUDIO_CACHE_PATH = f"{VIDEO_ID}.audio"  # 다운로드한 오디오 스트림 캐시
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -79,70 +102,191 @@ def extract_audio(video_path: str, audio_path: str) -> None:
         raise Exception(f"음성 추출 실패: {e}")
 
 
+# PCM_EXTRACTION이면 MP3를 만들지 않고 디코딩된 PCM 배열을 반환
+def load_audio(video_path: str, audio_path: str) -> Union[str, np.ndarray]:
+    if PCM_EXTRACTION:
+        return decode_audio(video_path)
+    extract_audio(video_path, audio_path)
+    return audio_path
+
+
 # Step 3: 음성 인식 (Whisper 라이브러리 사용)
-def transcribe_audio(audio_path: str) -> List[Dict]:
-    if not os.path.exists(audio_path):
-        raise FileNotFoundError(f"오디오 파일을 찾을 수 없습니다: {audio_path}")
+# audio는 오디오 파일 경로 또는 16kHz 모노 float32 PCM 배열
+def transcribe_audio(audio: Union[str, np.ndarray]) -> List[Dict]:
+    if isinstance(audio, str) and not os.path.exists(audio):
+        raise FileNotFoundError(f"오디오 파일을 찾을 수 없습니다: {audio}")
+
+    if TIERED:
+        # 단계별 전사는 이 프로세스에서 모델을 쓰므로 torch는 이때만 불러옴
+        from tests.tiered_transcriber import transcribe_tiered
+
+        segments, report = transcribe_tiered(audio)
+        logging.info(
+            f"큰 모델로 다시 전사한 비율: {report['escalated_fraction']:.1%} "
+            f"({report['escalated_seconds']:.0f}초 / {report['duration']:.0f}초)"
+        )
+        return segments
 
-    model = whisper.load_model("base")
-    result = model.transcribe(audio_path)
+    # 상주 Whisper 서버에서 미리 로드된 모델로 전사
+    result = whisper_server.transcribe(audio, "base")
     return result["segments"]
 
 
 # Step 4: 자막 파일 생성
-def create_srt(transcript_segments, srt_path):
-    subtitles = []
-    for i, segment in enumerate(transcript_segments):
-        start = srt.timedelta(seconds=segment["start"])
-        end = srt.timedelta(seconds=segment["end"])
-        content = segment["text"].strip()
-        subtitles.append(
-            srt.Subtitle(index=i + 1, start=start, end=end, content=content)
-        )
-
-    with open(srt_path, "w", encoding="utf-8") as srt_file:
-        srt_file.write(srt.compose(subtitles))
-
+# 구간을 한 번만 읽으면서 SRT와 JSON (WRITE_VTT이면 VTT도)을 함께 기록
+def create_subtitles(transcript_segments, srt_path: str, json_path: str) -> None:
+    vtt_path = os.path.splitext(srt_path)[0] + ".vtt" if WRITE_VTT else None
+    count = write_subtitles(transcript_segments, srt_path, json_path, vtt_path)
+    logging.info(f"자막 {count}개를 기록했습니다: {srt_path}, {json_path}")
+
+
+# 파이프라인 단계: 자신의 큐에서 작업을 꺼내 처리하고 다음 단계 큐로 넘김
+class PipelineStage:
+    def __init__(self, name: str, func, workers: int, out_queue=None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.in_queue = queue.Queue(maxsize=STAGE_QUEUE_SIZE)
+        self.out_queue = out_queue
+        self.threads = []
+        self.busy_seconds = 0.0
+        self.processed = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._run, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _run(self) -> None:
+        while True:
+            job = self.in_queue.get()
+            if job is None:
+                return
+            start = time.perf_counter()
+            try:
+                self.func(job)
+                ok = True
+            except Exception as e:
+                logging.error(f"[{self.name}] {job['url']} 처리 실패: {e}")
+                ok = False
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.busy_seconds += elapsed
+                self.processed += ok
+                self.failed += not ok
+            if ok and self.out_queue is not None:
+                self.out_queue.put(job)
+
+    # 작업 스레드마다 종료 신호를 보내고 모두 끝날 때까지 대기
+    def close(self) -> None:
+        for _ in self.threads:
+            self.in_queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+
+def create_job(url: str) -> Dict:
+    video_id = get_video_id(url)
+    return {
+        "url": url,
+        "video_id": video_id,
+        "video_path": video_id,
+        "audio_path": f"{video_id}.mp3",
+        "audio_cache_path": f"{video_id}.audio",
+        "srt_path": f"{video_id}.srt",
+        "json_path": f"{video_id}.json",
+    }
+
+
+# AUDIO_ONLY이면 다운로드 단계에서 오디오 스트림을 바로 디코딩합니다.
+def download_stage(job: Dict) -> None:
+    if AUDIO_ONLY:
+        job["audio"] = stream_youtube_audio(job["url"], job["audio_cache_path"])
+        return
+    job["video_file_path"] = download_video(job["url"], job["video_path"])
 
-def create_json(srt_path: str, json_path: str) -> None:
-    with open(srt_path, "r", encoding="utf-8") as srt_file:
-        subtitles = list(srt.parse(srt_file))
 
-    json_data = []
-    for subtitle in subtitles:
-        json_data.append(
-            {
-                "index": subtitle.index,
-                "start": subtitle.start.total_seconds(),
-                "end": subtitle.end.total_seconds(),
-                "content": subtitle.content,
-            }
+def extract_stage(job: Dict) -> None:
+    if "audio" in job:
+        return
+    job["audio"] = load_audio(job["video_file_path"], job["audio_path"])
+
+
+def transcribe_stage(job: Dict) -> None:
+    job["segments"] = transcribe_audio(job.pop("audio"))
+
+
+def output_stage(job: Dict) -> None:
+    create_subtitles(job["segments"], job["srt_path"], job["json_path"])
+
+
+# 여러 URL을 다운로드 → 음성 추출 → 음성 인식 → 출력 단계로 나누어 동시에 처리
+# 비디오 k를 전사하는 동안 k+1 다운로드와 k+2 추출이 진행됩니다.
+def run_pipeline(urls: List[str]) -> Dict[str, Dict]:
+    output = PipelineStage("output", output_stage, OUTPUT_WORKERS)
+    transcribe = PipelineStage(
+        "transcribe", transcribe_stage, TRANSCRIBE_WORKERS, output.in_queue
+    )
+    extract = PipelineStage(
+        "extract", extract_stage, EXTRACT_WORKERS, transcribe.in_queue
+    )
+    download = PipelineStage(
+        "download", download_stage, DOWNLOAD_WORKERS, extract.in_queue
+    )
+    stages = [download, extract, transcribe, output]
+
+    start = time.perf_counter()
+    for stage in stages:
+        stage.start()
+    for url in urls:
+        download.in_queue.put(create_job(url))
+    # 앞 단계부터 차례로 종료하면 남은 작업은 모두 다음 단계로 넘어갑니다.
+    for stage in stages:
+        stage.close()
+    wall_seconds = time.perf_counter() - start
+
+    report = {}
+    for stage in stages:
+        utilization = stage.busy_seconds / (wall_seconds * stage.workers)
+        report[stage.name] = {
+            "processed": stage.processed,
+            "failed": stage.failed,
+            "busy_seconds": stage.busy_seconds,
+            "utilization": utilization,
+        }
+        logging.info(
+            f"[{stage.name}] 처리 {stage.processed}, 실패 {stage.failed}, "
+            f"사용률 {utilization:.0%} ({stage.busy_seconds:.1f}s / {wall_seconds:.1f}s)"
         )
-
-    with open(json_path, "w", encoding="utf-8") as json_file:
-        json.dump(json_data, json_file, ensure_ascii=False, indent=2)
-
-    logging.info(f"JSON 파일이 생성되었습니다: {json_path}")
+    return report
 
 
 def main() -> None:
+    if len(VIDEO_URLS) > 1:
+        run_pipeline(VIDEO_URLS)
+        return
+
     try:
-        # 유튜브 비디오 다운로드
-        video_file_path = download_video(VIDEO_URL, VIDEO_PATH)
-        logging.info(f"다운로드된 비디오 파일 경로: {video_file_path}")
+        if AUDIO_ONLY:
+            # 오디오 스트림만 받아 디스크에 비디오를 쓰지 않고 디코딩
+            audio = stream_youtube_audio(VIDEO_URL, AUDIO_CACHE_PATH)
+        else:
+            # 유튜브 비디오 다운로드
+            video_file_path = download_video(VIDEO_URL, VIDEO_PATH)
+            logging.info(f"다운로드된 비디오 파일 경로: {video_file_path}")
 
-        # 음성 추출
-        extract_audio(video_file_path, AUDIO_PATH)
+            # 음성 추출
+            audio = load_audio(video_file_path, AUDIO_PATH)
 
         # 음성 인식
-        transcript_segments = transcribe_audio(AUDIO_PATH)
-
-        # 자막 파일 생성
-        create_srt(transcript_segments, SRT_PATH)
+        transcript_segments = transcribe_audio(audio)
 
-        # JSON 파일 생성
+        # 자막 파일과 JSON 파일 생성
         JSON_PATH = f"{VIDEO_ID}.json"
-        create_json(SRT_PATH, JSON_PATH)
+        create_subtitles(transcript_segments, SRT_PATH, JSON_PATH)
 
         logging.info(f"자막 파일이 생성되었습니다: {SRT_PATH}")
         logging.info(f"JSON 파일이 생성되었습니다: {JSON_PATH}")
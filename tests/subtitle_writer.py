@@ -0,0 +1,104 @@
+import json
+import os
+from datetime import timedelta
+
+import srt
+
+
+# 밀리초 단위로 자른 시간 (SRT에 기록되는 값과 같음)
+def to_milliseconds(delta):
+    return delta - timedelta(microseconds=delta.microseconds % 1000)
+
+
+# SRT 블록을 하나씩 바로 기록
+class SrtSink:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, index, start, end, content):
+        subtitle = srt.Subtitle(index=index, start=start, end=end, content=content)
+        self.f.write(subtitle.to_srt())
+
+    def close(self):
+        pass
+
+
+# WebVTT: SRT와 같지만 헤더가 있고 밀리초 구분자가 "."
+class VttSink:
+    def __init__(self, f):
+        self.f = f
+        self.f.write("WEBVTT\n\n")
+
+    def write(self, index, start, end, content):
+        start = srt.timedelta_to_srt_timestamp(start).replace(",", ".")
+        end = srt.timedelta_to_srt_timestamp(end).replace(",", ".")
+        self.f.write(f"{start} --> {end}\n{content}\n\n")
+
+    def close(self):
+        pass
+
+
+# json.dump(..., indent=2)와 같은 모양의 배열을 항목마다 이어 씀
+class JsonSink:
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+
+    def write(self, index, start, end, content):
+        item = {
+            "index": index,
+            "start": to_milliseconds(start).total_seconds(),
+            "end": to_milliseconds(end).total_seconds(),
+            "content": content,
+        }
+        text = json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self.f.write(("[\n  " if self.count == 0 else ",\n  ") + text)
+        self.count += 1
+
+    def close(self):
+        self.f.write("\n]" if self.count else "[]")
+
+
+SINKS = {"srt": SrtSink, "vtt": VttSink, "json": JsonSink}
+
+
+# segments를 한 번만 순회하면서 SRT / JSON / VTT 파일에 동시에 기록
+# 전체 자막 목록이나 합친 문자열을 만들지 않으므로 메모리 사용량이 일정합니다.
+# srt.compose와 같이 내용이 비었거나 시작 >= 끝인 구간은 건너뛰고 번호를 다시 매기며,
+# segments는 시작 시각 순이라고 가정합니다 (Whisper 출력은 항상 그렇습니다).
+# 파일은 임시 파일에 쓴 뒤 교체하므로 중간에 실패해도 반쯤 쓴 파일이 남지 않습니다.
+def write_subtitles(segments, srt_path=None, json_path=None, vtt_path=None):
+    targets = [
+        (path, SINKS[kind])
+        for kind, path in (("srt", srt_path), ("json", json_path), ("vtt", vtt_path))
+        if path
+    ]
+    files = []
+    try:
+        for path, _ in targets:
+            files.append(open(path + ".tmp", "w", encoding="utf-8"))
+        sinks = [sink(f) for f, (_, sink) in zip(files, targets)]
+
+        index = 0
+        for segment in segments:
+            content = srt.make_legal_content(segment["text"].strip())
+            start = timedelta(seconds=segment["start"])
+            end = timedelta(seconds=segment["end"])
+            if not content.strip() or start < timedelta(0) or start >= end:
+                continue
+            index += 1
+            for sink in sinks:
+                sink.write(index, start, end, content)
+
+        for sink in sinks:
+            sink.close()
+    except BaseException:
+        for f, (path, _) in zip(files, targets):
+            f.close()
+            os.remove(path + ".tmp")
+        raise
+
+    for f, (path, _) in zip(files, targets):
+        f.close()
+        os.replace(path + ".tmp", path)
+    return index
@@ -0,0 +1,132 @@
+import sys
+import time
+
+from tests import whisper_server
+from tests.audio_decoder import SAMPLE_RATE, decode_audio
+from tests.chunked_transcriber import stitch_segments
+from tests.transcript_metrics import segments_text, word_error_rate
+
+# 상수 정의
+FAST_MODEL = "base"
+ACCURATE_MODEL = "large"
+# 아래 기준 중 하나라도 걸리는 구간은 큰 모델로 다시 전사
+LOGPROB_THRESHOLD = -1.0  # 평균 로그 확률이 이보다 낮으면 의심
+COMPRESSION_RATIO_THRESHOLD = 2.4  # 압축률이 이보다 높으면 반복(환각) 의심
+NO_SPEECH_THRESHOLD = 0.6  # 무음일 확률이 높은데 텍스트가 나왔으면 의심
+MERGE_GAP_SECONDS = 1.0  # 이보다 가까운 의심 구간은 하나로 합쳐 한 번에 전사
+PROMPT_CHARS = 200  # 다시 전사할 때 앞 문맥으로 넘길 직전 텍스트 길이
+
+
+def is_low_confidence(segment):
+    if not segment["text"].strip():
+        return False
+    return (
+        segment["avg_logprob"] < LOGPROB_THRESHOLD
+        or segment["compression_ratio"] > COMPRESSION_RATIO_THRESHOLD
+        or segment["no_speech_prob"] > NO_SPEECH_THRESHOLD
+    )
+
+
+# 신뢰도가 낮은 구간들을 (시작, 끝) 시간 범위로 합침
+def find_low_confidence_ranges(segments, merge_gap=MERGE_GAP_SECONDS):
+    ranges = []
+    for segment in segments:
+        if not is_low_confidence(segment):
+            continue
+        if ranges and segment["start"] - ranges[-1][1] <= merge_gap:
+            ranges[-1][1] = max(ranges[-1][1], segment["end"])
+        else:
+            ranges.append([segment["start"], segment["end"]])
+    return [tuple(r) for r in ranges]
+
+
+# 해당 범위의 빠른 모델 구간을 큰 모델 결과로 바꿔 끼움
+def splice_segments(segments, replacements):
+    def inside(segment):
+        middle = (segment["start"] + segment["end"]) / 2
+        return any(start <= middle <= end for (start, end), _ in replacements)
+
+    kept = [segment for segment in segments if not inside(segment)]
+    for _, new_segments in replacements:
+        kept.extend(new_segments)
+    kept.sort(key=lambda segment: (segment["start"], segment["end"]))
+    return [dict(segment, id=i) for i, segment in enumerate(kept)]
+
+
+# 빠른 모델로 전체를 전사하고, 신뢰도가 낮은 범위만 큰 모델로 다시 전사해 합침
+# audio는 오디오 파일 경로 또는 16kHz 모노 float32 PCM 배열입니다.
+# 반환값: (segments, 보고서) - 보고서에는 큰 모델로 넘긴 오디오 비율이 들어 있습니다.
+def transcribe_tiered(
+    audio, fast_model=FAST_MODEL, accurate_model=ACCURATE_MODEL, **options
+):
+    if isinstance(audio, str):
+        audio = decode_audio(audio)
+    duration = len(audio) / SAMPLE_RATE
+
+    segments = whisper_server.transcribe(audio, fast_model, **options)["segments"]
+    ranges = find_low_confidence_ranges(segments)
+
+    replacements = []
+    for start, end in ranges:
+        clip = audio[int(start * SAMPLE_RATE) : int(end * SAMPLE_RATE)]
+        # 잘라낸 범위 앞의 (믿을 만한) 텍스트를 프롬프트로 주어 문맥을 이어 줌
+        previous = segments_text(
+            s for s in segments if s["end"] <= start and not is_low_confidence(s)
+        )
+        result = whisper_server.transcribe(
+            clip,
+            accurate_model,
+            initial_prompt=previous[-PROMPT_CHARS:] or None,
+            **options,
+        )
+        new_segments = stitch_segments([result["segments"]], [start])
+        replacements.append(((start, end), new_segments))
+
+    escalated_seconds = sum(end - start for start, end in ranges)
+    report = {
+        "duration": duration,
+        "ranges": ranges,
+        "escalated_seconds": escalated_seconds,
+        "escalated_fraction": escalated_seconds / duration if duration else 0.0,
+    }
+    return splice_segments(segments, replacements), report
+
+
+# 큰 모델 단독 전사와 단계별 전사의 시간, 큰 모델 결과 대비 오류율을 비교
+def main():
+    if len(sys.argv) < 2:
+        print("사용법: python -m tests.tiered_transcriber <오디오/비디오 파일>")
+        return
+    audio = decode_audio(sys.argv[1])
+    # 모델 로드 시간이 비교에 섞이지 않도록 두 모델을 미리 올려 둠
+    for model_name in (FAST_MODEL, ACCURATE_MODEL):
+        whisper_server.transcribe(audio[:SAMPLE_RATE], model_name)
+
+    start = time.perf_counter()
+    accurate = whisper_server.transcribe(audio, ACCURATE_MODEL)["segments"]
+    accurate_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = whisper_server.transcribe(audio, FAST_MODEL)["segments"]
+    fast_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tiered, report = transcribe_tiered(audio)
+    tiered_seconds = time.perf_counter() - start
+
+    reference = segments_text(accurate)
+    print(f"{ACCURATE_MODEL}: {accurate_seconds:.1f}초")
+    print(
+        f"{FAST_MODEL}: {fast_seconds:.1f}초, "
+        f"WER {word_error_rate(reference, segments_text(fast)):.1%}"
+    )
+    print(
+        f"단계별: {tiered_seconds:.1f}초 ({tiered_seconds / accurate_seconds:.0%}), "
+        f"WER {word_error_rate(reference, segments_text(tiered)):.1%}, "
+        f"큰 모델로 넘긴 비율 {report['escalated_fraction']:.1%} "
+        f"({len(report['ranges'])}개 범위)"
+    )
+
+
+if __name__ == "__main__":
+    main()
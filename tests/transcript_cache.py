@@ -0,0 +1,166 @@
+import fcntl
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from tests.transcript_format import FILE_EXTENSION, TranscriptReader, encode_transcript
+
+# 상수 정의
+CACHE_DIR = "data/cache/transcripts"
+CACHE_BUDGET_BYTES = 1024 * 1024 * 1024  # 캐시 디스크 예산 (1GB)
+MANIFEST_FILE = "manifest.json"
+CHECKPOINT_SUFFIX = ".checkpoint.jsonl"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+# 오디오 내용의 해시 (파일 경로 또는 PCM 배열)
+def audio_fingerprint(audio, extra=""):
+    digest = hashlib.sha256()
+    if isinstance(audio, np.ndarray):
+        digest.update(np.ascontiguousarray(audio).tobytes())
+    else:
+        with open(audio, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    # 같은 원본이라도 추출 방식(필터 등)이 다르면 다른 오디오로 취급
+    digest.update(extra.encode())
+    return digest.hexdigest()
+
+
+# 원본 파일을 구분하는 정보 (경로, 크기, 수정 시각, 추출 방식)
+def file_origin(path, extra=""):
+    info = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": info.st_size,
+        "mtime_ns": info.st_mtime_ns,
+        "extra": extra,
+    }
+
+
+# 오디오 해시 + 모델 이름 + 디코딩 옵션으로 캐시 키 생성
+def cache_key(fingerprint, model_name, options):
+    payload = json.dumps(
+        {"audio": fingerprint, "model": model_name, "options": options},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# 같은 폴더의 임시 파일에 쓴 뒤 교체하므로 중간에 죽어도 반쯤 쓴 파일이 남지 않음
+def atomic_write(path, data):
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+# 내용 기반 전사 결과 캐시
+# manifest.json에 항목별 크기를 기록하고, 전체 크기가 예산을 넘으면
+# 가장 오래 사용하지 않은 항목부터 삭제합니다.
+# 캐시 적중 때마다 manifest를 잠그고 다시 쓰지 않도록, 마지막 사용 시각은
+# 항목 파일의 mtime으로 기록하고 manifest는 put/_evict에서만 갱신합니다.
+class TranscriptCache:
+    def __init__(self, cache_dir=CACHE_DIR, budget_bytes=CACHE_BUDGET_BYTES):
+        self.cache_dir = cache_dir
+        self.budget_bytes = budget_bytes
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{FILE_EXTENSION}")
+
+    # 전사 중간 결과 (완료되어 캐시에 들어가면 지움)
+    def checkpoint_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{CHECKPOINT_SUFFIX}")
+
+    def remove_checkpoints(self, key):
+        for path in glob.glob(glob.escape(self.checkpoint_path(key)) + "*"):
+            os.remove(path)
+
+    # manifest는 항상 통째로 교체되므로 읽기만 할 때는 잠그지 않아도 됨
+    def read_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    # 여러 프로세스가 함께 쓰므로 manifest 갱신은 파일 잠금 안에서 진행
+    @contextmanager
+    def manifest(self):
+        with open(self.manifest_path + ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                manifest = self.read_manifest()
+                yield manifest
+                data = json.dumps(manifest, ensure_ascii=False, indent=2)
+                atomic_write(self.manifest_path, data.encode("utf-8"))
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # 같은 원본(file_origin)으로 만든 항목이 있으면 기록된 지문을 쓰고, 없을 때만
+    # 파일 전체를 해시합니다. 반환값: (지문, 원본 정보)
+    # 캐시 적중마다 큰 원본을 다시 읽지 않도록 put에 origin=, fingerprint=로 함께 기록
+    def fingerprint(self, path, extra=""):
+        origin = file_origin(path, extra)
+        for entry in self.read_manifest().values():
+            if entry.get("origin") == origin and "fingerprint" in entry:
+                return entry["fingerprint"], origin
+        return audio_fingerprint(path, extra), origin
+
+    # 구간을 필요할 때 읽는 TranscriptReader를 반환 (없거나 손상되었으면 None)
+    def get(self, key):
+        try:
+            segments = TranscriptReader(self.entry_path(key))
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(self.entry_path(key))
+        except FileNotFoundError:
+            pass
+        return segments
+
+    # manifest의 기록 시각과 항목 파일의 mtime(마지막 적중) 중 늦은 쪽
+    def _last_used(self, key, entry):
+        try:
+            return max(entry["last_used"], os.path.getmtime(self.entry_path(key)))
+        except OSError:
+            return entry["last_used"]
+
+    def put(self, key, segments, **metadata):
+        path = self.entry_path(key)
+        atomic_write(path, encode_transcript(segments))
+        with self.manifest() as manifest:
+            manifest[key] = {
+                "size": os.path.getsize(path),
+                "last_used": time.time(),
+                **metadata,
+            }
+            self._evict(manifest)
+
+    def _evict(self, manifest):
+        total = sum(entry["size"] for entry in manifest.values())
+        last_used = {
+            key: self._last_used(key, entry) for key, entry in manifest.items()
+        }
+        for key in sorted(manifest, key=last_used.get):
+            if total <= self.budget_bytes:
+                break
+            total -= manifest.pop(key)["size"]
+            try:
+                os.remove(self.entry_path(key))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,174 @@
+import itertools
+import json
+import mmap
+import struct
+
+import numpy as np
+
+# 상수 정의
+MAGIC = b"WTRS"
+FORMAT_VERSION = 1
+FILE_EXTENSION = ".wtr"
+# 매직, 버전, 구간 수, 토큰 수, 텍스트 바이트 수, 추가 필드 바이트 수
+HEADER = struct.Struct("<4sIQQQQ")
+ALIGNMENT = 8
+# 구간마다 하나씩 저장하는 숫자 열 (이름, 자료형, 값이 없을 때 기본값)
+COLUMNS = [
+    ("id", "<i4", 0),
+    ("seek", "<i4", 0),
+    ("start", "<f8", 0.0),
+    ("end", "<f8", 0.0),
+    ("temperature", "<f4", 0.0),
+    ("avg_logprob", "<f4", np.nan),
+    ("compression_ratio", "<f4", np.nan),
+    ("no_speech_prob", "<f4", np.nan),
+]
+# 열로 저장하지 않는 나머지 키(words 등)는 구간별 JSON으로 보관
+STORED_KEYS = {name for name, _, _ in COLUMNS} | {"text", "tokens"}
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _offsets(lengths):
+    offsets = np.zeros(len(lengths) + 1, "<u8")
+    offsets[1:] = np.cumsum(lengths)
+    return offsets
+
+
+# Whisper segments를 열 단위 바이너리로 변환
+# [헤더][숫자 열들][토큰 오프셋][토큰][텍스트 오프셋][텍스트][추가 오프셋][추가]
+# 각 구역은 8바이트 경계에 맞춰 mmap 위에서 바로 배열로 읽을 수 있습니다.
+def encode_transcript(segments):
+    segments = list(segments)
+    count = len(segments)
+    tokens = [segment.get("tokens", []) for segment in segments]
+    texts = [segment.get("text", "").encode("utf-8") for segment in segments]
+    extras = []
+    for segment in segments:
+        extra = {k: v for k, v in segment.items() if k not in STORED_KEYS}
+        extras.append(json.dumps(extra, ensure_ascii=False).encode() if extra else b"")
+
+    token_offsets = _offsets([len(t) for t in tokens])
+    sections = [
+        np.array([segment.get(name, default) for segment in segments], dtype)
+        for name, dtype, default in COLUMNS
+    ]
+    sections += [
+        token_offsets,
+        np.fromiter(
+            itertools.chain.from_iterable(tokens), "<i4", count=int(token_offsets[-1])
+        ),
+        _offsets([len(t) for t in texts]),
+        b"".join(texts),
+        _offsets([len(e) for e in extras]),
+        b"".join(extras),
+    ]
+
+    text_size = len(sections[-3])
+    extra_size = len(sections[-1])
+    parts = [
+        HEADER.pack(
+            MAGIC, FORMAT_VERSION, count, int(token_offsets[-1]), text_size, extra_size
+        )
+    ]
+    size = HEADER.size
+    for section in sections:
+        data = section.tobytes() if isinstance(section, np.ndarray) else section
+        padding = _align(size) - size
+        parts.append(b"\0" * padding + data)
+        size += padding + len(data)
+    return b"".join(parts)
+
+
+# 바이너리 전사 파일을 mmap으로 열고 구간을 필요할 때 하나씩 만들어 주는 읽기 객체
+# 시작/끝 시각 등 숫자 열은 columns[이름]으로 복사 없이 바로 쓸 수 있습니다.
+class TranscriptReader:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _parse(self):
+        if len(self._mmap) < HEADER.size:
+            raise ValueError("전사 파일 헤더가 잘렸습니다.")
+        magic, version, count, token_count, text_size, extra_size = HEADER.unpack_from(
+            self._mmap
+        )
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("지원하지 않는 전사 파일 형식입니다.")
+        self.count = count
+        offset = HEADER.size
+
+        def array(dtype, length):
+            nonlocal offset
+            offset = _align(offset)
+            values = np.frombuffer(self._mmap, dtype, length, offset)
+            offset += values.nbytes
+            return values
+
+        def blob(length):
+            nonlocal offset
+            offset = _align(offset)
+            start = offset
+            offset += length
+            if offset > len(self._mmap):
+                raise ValueError("전사 파일이 잘렸습니다.")
+            return start
+
+        self.columns = {name: array(dtype, count) for name, dtype, _ in COLUMNS}
+        self.token_offsets = array("<u8", count + 1)
+        self.tokens = array("<i4", token_count)
+        self.text_offsets = array("<u8", count + 1)
+        self._text_start = blob(text_size)
+        self.extra_offsets = array("<u8", count + 1)
+        self._extra_start = blob(extra_size)
+
+    def __len__(self):
+        return self.count
+
+    def text(self, index):
+        start = self._text_start + int(self.text_offsets[index])
+        end = self._text_start + int(self.text_offsets[index + 1])
+        return self._mmap[start:end].decode("utf-8")
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        segment = {name: values[index].item() for name, values in self.columns.items()}
+        segment["text"] = self.text(index)
+        start = int(self.token_offsets[index])
+        end = int(self.token_offsets[index + 1])
+        segment["tokens"] = self.tokens[start:end].tolist()
+        start = self._extra_start + int(self.extra_offsets[index])
+        end = self._extra_start + int(self.extra_offsets[index + 1])
+        if end > start:
+            segment.update(json.loads(self._mmap[start:end]))
+        return segment
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def close(self):
+        # 배열 뷰가 mmap을 참조하고 있으므로 먼저 놓아야 닫을 수 있습니다.
+        self.columns = {}
+        self.token_offsets = self.tokens = None
+        self.text_offsets = self.extra_offsets = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_transcript(path):
+    with TranscriptReader(path) as reader:
+        return list(reader)
@@ -0,0 +1,24 @@
+import numpy as np
+
+
+# 단어 단위 편집 거리로 계산한 오류율 (reference 기준)
+def word_error_rate(reference, hypothesis):
+    ref = reference.split()
+    hyp = hypothesis.split()
+    if not ref:
+        return float(bool(hyp))
+    distances = np.arange(len(hyp) + 1)
+    for i, ref_word in enumerate(ref, start=1):
+        previous = distances.copy()
+        distances[0] = i
+        for j, hyp_word in enumerate(hyp, start=1):
+            distances[j] = min(
+                previous[j] + 1,
+                distances[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+    return distances[-1] / len(ref)
+
+
+def segments_text(segments):
+    return " ".join(segment["text"].strip() for segment in segments)
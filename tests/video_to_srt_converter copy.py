@@ -2,6 +2,13 @@ import os
 import subprocess
 import whisper
 import srt
+import sys
+
+# python tests/파일.py처럼 직접 실행할 때도 tests 패키지를 찾도록 저장소 루트를 추가
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests import whisper_server
+from tests.silence_cutter import remove_silence, subtitle_intervals
 import json
 from tqdm import tqdm
 
@@ -53,14 +60,13 @@ def transcribe_audio(audio_path, cache_path):
         raise FileNotFoundError(f"오디오 파일을 찾을 수 없습니다: {audio_path}")
 
     print(f"음성 인식 중: {audio_path}")
-    model = whisper.load_model("small")
-
     # 음악 관련 토큰 억제
     options = whisper.DecodingOptions(
         suppress_tokens=[-1, 1, 2, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20]
     )
 
-    result = model.transcribe(audio_path, **options.__dict__)
+    # 상주 Whisper 서버에서 미리 로드된 모델로 전사
+    result = whisper_server.transcribe(audio_path, "small", **options.__dict__)
 
     # 캐시에 결과 저장
     with open(cache_path, "w", encoding="utf-8") as f:
@@ -86,48 +92,16 @@ def create_srt(transcript_segments, srt_path):
     print(f"자막 파일이 생성되었습니다: {srt_path}")
 
 
+# 자막 구간만 남기고 무음 구간 제거 (가능하면 다시 인코딩하지 않고 스트림 복사)
 def cut_silent_parts(video_path, srt_path, output_path):
     # 출력 파일이 이미 존재하는지 확인
     if os.path.exists(output_path):
         print(f"무음 구간이 제거된 비디오가 이미 존재합니다: {output_path}")
         return
 
-    # SRT 파일 읽기
-    with open(srt_path, "r", encoding="utf-8") as f:
-        subtitles = list(srt.parse(f))
-
-    # 임시 파일 생성을 위한 경로
-    temp_file = output_path + ".temp"
-
-    # 자막 정보를 바탕으로 컷 리스트 생성
-    with open(temp_file, "w", encoding="utf-8") as f:
-        for sub in subtitles:
-            f.write(f"between(t,{sub.start.total_seconds()},{sub.end.total_seconds()})")
-            if sub != subtitles[-1]:
-                f.write("+")
-
-    # ffmpeg를 사용하여 무음 구간 제거
-    command = [
-        "ffmpeg",
-        "-i",
-        video_path,
-        "-vf",
-        f"select='{open(temp_file, 'r').read()}',setpts=N/FRAME_RATE/TB",
-        "-af",
-        f"aselect='{open(temp_file, 'r').read()}',asetpts=N/SR/TB",
-        "-y",
-        output_path,
-    ]
-
-    result = subprocess.run(command, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"오류 발생: {result.stderr}")
-        raise Exception("무음 구간 제거 실패")
-
-    # 임시 파일 삭제
-    os.remove(temp_file)
+    mode = remove_silence(video_path, subtitle_intervals(srt_path), output_path)
 
-    print(f"무음 구간이 제거된 비디오가 생성되었습니다: {output_path}")
+    print(f"무음 구간이 제거된 비디오가 생성되었습니다: {output_path} ({mode})")
 
 
 def process_video(video_path, output_folder, cache_folder):
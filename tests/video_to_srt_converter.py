@@ -1,10 +1,51 @@
 import os
 import subprocess
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import torch
 import whisper
-import srt
+import sys
+
+# python tests/파일.py처럼 직접 실행할 때도 tests 패키지를 찾도록 저장소 루트를 추가
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests import whisper_server
+from tests.audio_decoder import SAMPLE_RATE, decode_audio, probe_duration
+from tests.chunked_transcriber import transcribe_long_audio
+from tests.inference_backend import load_model, model_spec, supports_window_decoding
+from tests.resumable_transcriber import transcribe_resumable
+from tests.subtitle_writer import write_subtitles
+from tests.tiered_transcriber import ACCURATE_MODEL, FAST_MODEL, transcribe_tiered
+from tests.transcript_cache import TranscriptCache, cache_key
 import json
 from tqdm import tqdm
 
+# 상수 정의
+MODEL_NAME = "small"
+# CPU 추론 백엔드: "fp32"(기본), "int8"(선형 계층 동적 양자화), "ctranslate2"(faster-whisper)
+# 비교: python -m tests.inference_backend <오디오 파일> --model small
+BACKEND = "fp32"
+MODEL = model_spec(MODEL_NAME, BACKEND)  # 모델 로드와 캐시 키에 쓰는 "이름:백엔드"
+# 하이퍼스레딩을 제외한 물리 코어 수 추정
+PHYSICAL_CORES = max(1, (os.cpu_count() or 2) // 2)
+NUM_WORKERS = PHYSICAL_CORES  # 병렬 전사 프로세스 수 (1이면 순차 처리)
+AUDIO_FILTER = "highpass=f=200, lowpass=f=3000"
+PCM_EXTRACTION = True  # MP3 두 번 인코딩 대신 필터 적용 후 메모리 PCM으로 바로 디코딩
+# 이보다 긴 PCM 오디오는 무음 구간에서 나누어 여러 프로세스로 동시에 전사
+LONG_AUDIO_SECONDS = 600
+TRANSCRIPT_CACHE_BUDGET = 1024 * 1024 * 1024  # 전사 캐시 디스크 예산 (1GB)
+# 30초 창마다 체크포인트를 남겨, 중단되면 다음 실행에서 이어서 전사
+RESUMABLE = True
+# 빠른 모델로 전체를 전사하고 신뢰도가 낮은 범위만 큰 모델로 다시 전사
+TIERED = False
+# 이보다 짧은 비디오(쇼츠)는 여러 개의 멜 창을 쌓아 한 번에 전사
+SHORT_CLIP_SECONDS = 60
+SHORT_BATCH_FILES = 16  # 한 번에 묶는 파일 수 (1이면 사용 안 함)
+
+# 병렬 처리 시 각 작업 프로세스가 한 번만 로드해 두는 모델
+_worker_model = None
+
 
 # Step 1: 음성 추출
 def extract_audio(video_path, audio_path):
@@ -29,7 +70,7 @@ def extract_audio(video_path, audio_path):
             "-i",
             temp_audio_path,
             "-af",
-            "highpass=f=200, lowpass=f=3000",
+            AUDIO_FILTER,
             audio_path,
         ]
     )
@@ -42,64 +83,253 @@ def extract_audio(video_path, audio_path):
     print(f"오디오 추출 및 필터링 완료: {audio_path}")
 
 
+# 음악 관련 토큰 억제
+def decoding_options():
+    return whisper.DecodingOptions(
+        suppress_tokens=[-1, 1, 2, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20]
+    )
+
+
 # Step 2: 음성 인식 (Whisper 라이브러리 사용)
-def transcribe_audio(audio_path, cache_path):
-    if os.path.exists(cache_path):
-        print(f"캐시된 전사 결과를 불러옵니다: {cache_path}")
-        with open(cache_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+# audio_path 대신 16kHz 모노 float32 PCM 배열이나, 캐시가 없을 때만 오디오를
+# 디코딩해 돌려주는 함수를 넘길 수도 있습니다.
+# 캐시 키는 오디오 내용 해시 + 모델 이름 + 디코딩 옵션이므로, 모델이나 옵션이
+# 바뀌거나 이름이 같은 다른 비디오라도 예전 결과를 잘못 쓰지 않습니다.
+def transcribe_audio(
+    audio_path, cache, fingerprint, model=None, source=None, origin=None
+):
+    options = decoding_options()
+    model_name = f"{FAST_MODEL}+{ACCURATE_MODEL}" if TIERED else MODEL
+    key = cache_key(fingerprint, model_name, options.__dict__)
+    segments = cache.get(key)
+    if segments is not None:
+        print(f"캐시된 전사 결과를 불러옵니다: {source or key}")
+        return segments
 
-    if not os.path.exists(audio_path):
+    if callable(audio_path):
+        audio_path = audio_path()
+    is_path = isinstance(audio_path, str)
+    if is_path and not os.path.exists(audio_path):
         raise FileNotFoundError(f"오디오 파일을 찾을 수 없습니다: {audio_path}")
 
-    print(f"음성 인식 중: {audio_path}")
-    model = whisper.load_model("small")
-
-    # 음악 관련 토큰 억제
-    options = whisper.DecodingOptions(
-        suppress_tokens=[-1, 1, 2, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20]
-    )
+    print(f"음성 인식 중: {audio_path if is_path else source}")
+    # 창 단위 디코딩(체크포인트)은 넘겨받은 모델이 있으면 그 모델 기준으로 판단
+    # (faster-whisper 모델에는 model.decode가 없음)
+    if model is not None:
+        window_decoding = hasattr(model, "decode")
+    else:
+        window_decoding = supports_window_decoding(MODEL)
+    checkpoint = None
+    if RESUMABLE and window_decoding:
+        checkpoint = (os.path.abspath(cache.checkpoint_path(key)), key)
 
-    result = model.transcribe(audio_path, **options.__dict__)
+    if TIERED:
+        segments, report = transcribe_tiered(audio_path, **options.__dict__)
+        result = {"segments": segments}
+        print(
+            f"큰 모델({ACCURATE_MODEL})로 다시 전사한 비율: "
+            f"{report['escalated_fraction']:.1%} ({len(report['ranges'])}개 범위)"
+        )
+    elif model is not None:
+        if checkpoint:
+            result = transcribe_resumable(
+                model, audio_path, *checkpoint, **options.__dict__
+            )
+        else:
+            result = model.transcribe(audio_path, **options.__dict__)
+    elif not is_path and len(audio_path) > LONG_AUDIO_SECONDS * SAMPLE_RATE:
+        segments = transcribe_long_audio(
+            audio_path, MODEL, checkpoint=checkpoint, **options.__dict__
+        )
+        result = {"segments": segments}
+    else:
+        # 상주 Whisper 서버에서 미리 로드된 모델로 전사
+        result = whisper_server.transcribe(
+            audio_path, MODEL, checkpoint=checkpoint, **options.__dict__
+        )
 
-    # 캐시에 결과 저장
-    with open(cache_path, "w", encoding="utf-8") as f:
-        json.dump(result["segments"], f, ensure_ascii=False, indent=2)
+    # 캐시에 결과 저장 (임시 파일에 쓴 뒤 교체, 예산을 넘으면 LRU 삭제)
+    cache.put(
+        key,
+        result["segments"],
+        model=model_name,
+        source=source,
+        fingerprint=fingerprint,
+        origin=origin,
+    )
+    cache.remove_checkpoints(key)
 
     return result["segments"]
 
 
-# Step 3: 자막 파일 생성
+# Step 3: 자막 파일 생성 (구간을 하나씩 바로 기록)
 def create_srt(transcript_segments, srt_path):
-    subtitles = []
-    for i, segment in enumerate(transcript_segments):
-        start = srt.timedelta(seconds=segment["start"])
-        end = srt.timedelta(seconds=segment["end"])
-        content = segment["text"].strip()
-        subtitles.append(
-            srt.Subtitle(index=i + 1, start=start, end=end, content=content)
-        )
-
-    with open(srt_path, "w", encoding="utf-8") as srt_file:
-        srt_file.write(srt.compose(subtitles))
-
+    write_subtitles(transcript_segments, srt_path)
     print(f"자막 파일이 생성되었습니다: {srt_path}")
 
 
 def process_video(video_path, output_folder, cache_folder):
+    try:
+        convert_video(video_path, output_folder, cache_folder)
+    except Exception as e:
+        print(f"오류 발생 ({video_path}): {e}")
+
+
+def transcript_cache(cache_folder):
+    return TranscriptCache(
+        os.path.join(cache_folder, "transcripts"), TRANSCRIPT_CACHE_BUDGET
+    )
+
+
+def convert_video(video_path, output_folder, cache_folder, model=None):
     base_name = os.path.splitext(os.path.basename(video_path))[0]
     audio_path = os.path.join(output_folder, f"{base_name}.mp3")
     srt_path = os.path.join(
         cache_folder, f"{base_name}.srt"
     )  # srt 파일 경로를 cache_folder로 변경
-    cache_path = os.path.join(cache_folder, f"{base_name}_transcript.json")
+    cache = transcript_cache(cache_folder)
 
-    try:
+    if PCM_EXTRACTION:
+        # 디코딩 결과는 원본과 필터로 정해지므로 원본 파일을 해시하고,
+        # 캐시가 있으면 디코딩도 건너뜁니다.
+        fingerprint, origin = cache.fingerprint(video_path, AUDIO_FILTER)
+        audio = partial(decode_audio, video_path, AUDIO_FILTER)
+    else:
         extract_audio(video_path, audio_path)
-        transcript_segments = transcribe_audio(audio_path, cache_path)
-        create_srt(transcript_segments, srt_path)
-    except Exception as e:
-        print(f"오류 발생 ({video_path}): {e}")
+        fingerprint, origin = cache.fingerprint(audio_path)
+        audio = audio_path
+    transcript_segments = transcribe_audio(
+        audio, cache, fingerprint, model, source=base_name, origin=origin
+    )
+    create_srt(transcript_segments, srt_path)
+
+
+# 작업 프로세스 초기화: CPU 과다 할당을 막도록 스레드 수를 제한하고 모델을 한 번 로드
+def init_worker(model_name, num_threads):
+    global _worker_model
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+    _worker_model = load_model(model_name)
+
+
+def convert_video_in_worker(video_path, output_folder, cache_folder):
+    convert_video(video_path, output_folder, cache_folder, _worker_model)
+
+
+# 작업 큐의 파일을 여러 프로세스가 나누어 처리하고, 실패한 파일은 따로 기록
+def process_videos_parallel(video_paths, output_folder, cache_folder, workers):
+    threads_per_worker = max(1, PHYSICAL_CORES // workers)
+    failures = {}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=init_worker,
+        initargs=(MODEL, threads_per_worker),
+    ) as executor:
+        futures = {
+            executor.submit(
+                convert_video_in_worker, video_path, output_folder, cache_folder
+            ): video_path
+            for video_path in video_paths
+        }
+        for future in tqdm(
+            as_completed(futures), total=len(futures), desc="비디오 처리 중"
+        ):
+            video_path = futures[future]
+            error = future.exception()
+            if error is not None:
+                failures[video_path] = str(error)
+                print(f"오류 발생 ({video_path}): {error}")
+    return failures
+
+
+# 처리에 실패한 파일과 오류 메시지를 failures.json에 기록
+def record_failures(failures, cache_folder):
+    if not failures:
+        return
+    failures_path = os.path.join(cache_folder, "failures.json")
+    with open(failures_path, "w", encoding="utf-8") as f:
+        json.dump(failures, f, ensure_ascii=False, indent=2)
+    print(f"{len(failures)}개 파일 처리 실패, 목록: {failures_path}")
+
+
+# 짧은 비디오들을 SHORT_BATCH_FILES개씩 묶어 상주 서버에서 한 번에 전사
+# 묶음 전사가 실패하면 그 묶음의 파일은 하나씩 convert_video로 다시 처리합니다.
+# 반환값: (처리하지 않은 긴 비디오 경로 목록, 실패한 파일 -> 오류 메시지)
+def process_short_videos(video_paths, output_folder, cache_folder):
+    short, remaining = [], []
+    for video_path in video_paths:
+        try:
+            is_short = probe_duration(video_path) <= SHORT_CLIP_SECONDS
+        except Exception:
+            is_short = False
+        (short if is_short else remaining).append(video_path)
+
+    cache = transcript_cache(cache_folder)
+    options = decoding_options()
+    failures = {}
+    pending = []
+    for video_path in short:
+        base_name = os.path.splitext(os.path.basename(video_path))[0]
+        srt_path = os.path.join(cache_folder, f"{base_name}.srt")
+        try:
+            fingerprint, origin = cache.fingerprint(video_path, AUDIO_FILTER)
+            key = cache_key(fingerprint, MODEL, options.__dict__)
+            segments = cache.get(key)
+            if segments is not None:
+                create_srt(segments, srt_path)
+            else:
+                pending.append(
+                    (video_path, base_name, srt_path, key, fingerprint, origin)
+                )
+        except Exception as e:
+            failures[video_path] = str(e)
+            print(f"오류 발생 ({video_path}): {e}")
+
+    progress = tqdm(total=len(pending), desc="짧은 비디오 묶음 전사 중")
+    for start in range(0, len(pending), SHORT_BATCH_FILES):
+        batch = []
+        for video_path, *entry in pending[start : start + SHORT_BATCH_FILES]:
+            try:
+                audio = decode_audio(video_path, AUDIO_FILTER)
+            except Exception as e:
+                failures[video_path] = str(e)
+                print(f"오류 발생 ({video_path}): {e}")
+                continue
+            batch.append((audio, video_path, *entry))
+        if not batch:
+            continue
+
+        try:
+            results = whisper_server.transcribe_many(
+                [audio for audio, *_ in batch], MODEL, **options.__dict__
+            )
+        except Exception as e:
+            print(f"묶음 전사 실패, 파일별로 다시 처리합니다: {e}")
+            results = [None] * len(batch)
+
+        for entry, result in zip(batch, results):
+            _, video_path, base_name, srt_path, key, fingerprint, origin = entry
+            try:
+                if result is None:
+                    convert_video(video_path, output_folder, cache_folder)
+                else:
+                    cache.put(
+                        key,
+                        result["segments"],
+                        model=MODEL,
+                        source=base_name,
+                        fingerprint=fingerprint,
+                        origin=origin,
+                    )
+                    create_srt(result["segments"], srt_path)
+            except Exception as e:
+                failures[video_path] = str(e)
+                print(f"오류 발생 ({video_path}): {e}")
+        progress.update(len(batch))
+    progress.close()
+    return remaining, failures
 
 
 def main():
@@ -111,13 +341,33 @@ def main():
         os.makedirs(folder, exist_ok=True)
 
     video_extensions = (".mp4", ".avi", ".mov", ".webm")
-    video_files = [
-        f for f in os.listdir(video_folder) if f.lower().endswith(video_extensions)
+    video_paths = [
+        os.path.join(video_folder, f)
+        for f in os.listdir(video_folder)
+        if f.lower().endswith(video_extensions)
     ]
 
-    for video_file in tqdm(video_files, desc="비디오 처리 중"):
-        video_path = os.path.join(video_folder, video_file)
-        process_video(video_path, output_folder, cache_folder)
+    if (
+        PCM_EXTRACTION
+        and not TIERED
+        and SHORT_BATCH_FILES > 1
+        and supports_window_decoding(MODEL)
+    ):
+        video_paths, failures = process_short_videos(
+            video_paths, output_folder, cache_folder
+        )
+    else:
+        failures = {}
+
+    if NUM_WORKERS > 1 and len(video_paths) > 1:
+        workers = min(NUM_WORKERS, len(video_paths))
+        failures.update(
+            process_videos_parallel(video_paths, output_folder, cache_folder, workers)
+        )
+    else:
+        for video_path in tqdm(video_paths, desc="비디오 처리 중"):
+            process_video(video_path, output_folder, cache_folder)
+    record_failures(failures, cache_folder)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,12 @@
 import os
 import subprocess
-import whisper
 import srt
+import sys
+
+# python tests/파일.py처럼 직접 실행할 때도 tests 패키지를 찾도록 저장소 루트를 추가
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests import whisper_server
 import json
 from tqdm import tqdm
 
@@ -29,8 +34,8 @@ def transcribe_audio(audio_path, cache_path):
         raise FileNotFoundError(f"오디오 파일을 찾을 수 없습니다: {audio_path}")
 
     print(f"음성 인식 중: {audio_path}")
-    model = whisper.load_model("large")
-    result = model.transcribe(audio_path)
+    # 상주 Whisper 서버에서 미리 로드된 모델로 전사
+    result = whisper_server.transcribe(audio_path, "large")
 
     # 캐시에 결과 저장
     with open(cache_path, "w", encoding="utf-8") as f:
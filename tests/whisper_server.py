@@ -0,0 +1,312 @@
+import fcntl
+import logging
+import os
+import secrets
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+# 상수 정의
+# 소켓, 인증 키, 시작 잠금 파일은 현재 사용자만 접근할 수 있는 0700 디렉터리에 둠
+RUNTIME_DIR = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR")
+    or os.path.join(tempfile.gettempdir(), f"whisper-server-{os.getuid()}"),
+    "whisper_server",
+)
+SOCKET_PATH = os.environ.get(
+    "WHISPER_SERVER_SOCKET", os.path.join(RUNTIME_DIR, "server.sock")
+)
+AUTHKEY_BYTES = 32
+MAX_LOADED_MODELS = 2  # 동시에 메모리에 유지할 모델 수
+IDLE_TIMEOUT = 600  # 이 시간(초) 동안 사용하지 않은 모델은 메모리에서 내림
+START_TIMEOUT = 60  # 서버 시작을 기다리는 최대 시간 (초)
+
+
+# 캐시에 올라간 모델 하나 (로드가 끝나면 loaded가 설정됨)
+class LoadedModel:
+    def __init__(self):
+        self.model = None
+        self.error = None
+        self.loaded = threading.Event()
+        self.last_used = time.time()
+        self.users = 0  # 이 모델로 처리 중인 요청 수 (0일 때만 내림)
+        self.lock = threading.Lock()  # 같은 모델 객체는 한 번에 하나의 요청만 사용
+
+
+# 모델 크기별로 한 번만 로드하고, LRU 순서와 유휴 시간으로 내리는 캐시
+# 로드는 전역 잠금 밖에서 하므로 이미 로드된 다른 모델의 요청을 막지 않으며,
+# 같은 모델을 동시에 요청하면 먼저 온 요청이 로드하고 나머지는 기다립니다.
+class ModelCache:
+    def __init__(self, max_models=MAX_LOADED_MODELS, idle_timeout=IDLE_TIMEOUT):
+        self.max_models = max_models
+        self.idle_timeout = idle_timeout
+        self.models = OrderedDict()  # 이름 -> LoadedModel
+        self.lock = threading.Lock()
+
+    def acquire(self, name):
+        # torch/whisper는 서버에서만 필요하므로 클라이언트가 불러오지 않도록 여기서 import
+        from tests import inference_backend
+
+        with self.lock:
+            entry = self.models.get(name)
+            should_load = entry is None
+            if should_load:
+                entry = self.models[name] = LoadedModel()
+            entry.users += 1
+            entry.last_used = time.time()
+            self.models.move_to_end(name)
+
+        if should_load:
+            logging.info(f"Whisper 모델 로드: {name}")
+            try:
+                entry.model = inference_backend.load_model(name)
+            except Exception as e:
+                entry.error = e
+                with self.lock:
+                    if self.models.get(name) is entry:
+                        del self.models[name]
+            entry.loaded.set()
+        else:
+            entry.loaded.wait()
+
+        if entry.error is not None:
+            self.release(entry)
+            raise Exception(f"Whisper 모델 로드 실패 ({name}): {entry.error}")
+        with self.lock:
+            self._evict_lru()
+        return entry
+
+    def release(self, entry):
+        with self.lock:
+            entry.users -= 1
+            entry.last_used = time.time()
+            self._evict_lru()
+
+    @contextmanager
+    def use(self, name):
+        entry = self.acquire(name)
+        try:
+            yield entry
+        finally:
+            self.release(entry)
+
+    # self.lock 안에서 호출. 사용 중인 모델은 건너뛰므로 잠시 한도를 넘을 수 있음
+    def _evict_lru(self):
+        while len(self.models) > self.max_models:
+            idle = [n for n, e in self.models.items() if not e.users]
+            if not idle:
+                break
+            del self.models[idle[0]]
+            logging.info(f"Whisper 모델 해제 (LRU): {idle[0]}")
+
+    def evict_idle(self):
+        with self.lock:
+            now = time.time()
+            for name in [
+                n
+                for n, e in self.models.items()
+                if not e.users and now - e.last_used > self.idle_timeout
+            ]:
+                del self.models[name]
+                logging.info(f"Whisper 모델 해제 (유휴): {name}")
+
+
+def handle_connection(conn, cache):
+    from tests.batch_transcriber import transcribe_batch
+    from tests.resumable_transcriber import transcribe_resumable
+
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                return
+            try:
+                with cache.use(request["model"]) as entry, entry.lock:
+                    model = entry.model
+                    if request.get("batch"):
+                        result = transcribe_batch(
+                            model, request["audio"], **request["options"]
+                        )
+                    elif request.get("checkpoint"):
+                        path, key = request["checkpoint"]
+                        result = transcribe_resumable(
+                            model, request["audio"], path, key, **request["options"]
+                        )
+                    else:
+                        result = model.transcribe(
+                            request["audio"], **request["options"]
+                        )
+                conn.send({"result": result})
+            except Exception as e:
+                logging.error(f"전사 요청 처리 중 오류 발생: {e}", exc_info=True)
+                conn.send({"error": str(e)})
+    finally:
+        conn.close()
+
+
+# 소켓 디렉터리를 만들고, 다른 사용자가 미리 만들었거나 열어 둔 디렉터리는 거부
+def secure_dir(socket_path):
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+        raise Exception(f"다른 사용자가 접근할 수 있는 디렉터리입니다: {directory}")
+    return directory
+
+
+def authkey_path(socket_path):
+    return socket_path + ".key"
+
+
+# 서버를 시작할 때마다 새 임의 키를 0600 파일로 기록
+def create_authkey(socket_path):
+    key = secrets.token_bytes(AUTHKEY_BYTES)
+    temp_path = authkey_path(socket_path) + ".tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    os.replace(temp_path, authkey_path(socket_path))
+    return key
+
+
+def read_authkey(socket_path):
+    with open(authkey_path(socket_path), "rb") as f:
+        info = os.fstat(f.fileno())
+        if info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+            raise Exception(f"인증 키 파일 권한이 올바르지 않습니다: {f.name}")
+        return f.read()
+
+
+# 인증과 상관없이 누군가 이 소켓에서 연결을 받고 있는지
+def socket_in_use(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+            return True
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+
+
+def serve(socket_path=SOCKET_PATH):
+    secure_dir(socket_path)
+    # 살아 있는 서버의 소켓은 지우지 않음 (남은 파일만 정리)
+    if socket_in_use(socket_path):
+        raise Exception(f"Whisper 서버가 이미 실행 중입니다: {socket_path}")
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    authkey = read_authkey(socket_path)
+    cache = ModelCache()
+
+    def evict_loop():
+        while True:
+            time.sleep(cache.idle_timeout / 4)
+            cache.evict_idle()
+
+    threading.Thread(target=evict_loop, daemon=True).start()
+
+    with Listener(socket_path, family="AF_UNIX", authkey=authkey) as listener:
+        logging.info(f"Whisper 서버 시작: {socket_path}")
+        while True:
+            # 인증에 실패하거나 연결만 확인하고 끊은 클라이언트는 무시
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, EOFError, OSError) as e:
+                logging.warning(f"연결 거부: {e}")
+                continue
+            threading.Thread(
+                target=handle_connection, args=(conn, cache), daemon=True
+            ).start()
+
+
+def try_connect(socket_path):
+    try:
+        return Client(socket_path, family="AF_UNIX", authkey=read_authkey(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+
+
+# 서버에 연결하고, 실행 중이 아니면 백그라운드로 시작합니다.
+# 여러 프로세스가 동시에 서버를 띄우지 않도록 시작은 잠금 파일 아래에서 한 번만 합니다.
+def connect(socket_path=SOCKET_PATH):
+    secure_dir(socket_path)
+    conn = try_connect(socket_path)
+    if conn is not None:
+        return conn
+
+    with open(socket_path + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        # 잠금을 기다리는 동안 다른 프로세스가 서버를 띄웠을 수 있음
+        conn = try_connect(socket_path)
+        if conn is not None:
+            return conn
+
+        logging.info("Whisper 서버가 실행 중이 아니므로 시작합니다.")
+        create_authkey(socket_path)
+        subprocess.Popen(
+            [sys.executable, "-m", "tests.whisper_server", socket_path],
+            start_new_session=True,
+        )
+        deadline = time.time() + START_TIMEOUT
+        while time.time() < deadline:
+            conn = try_connect(socket_path)
+            if conn is not None:
+                return conn
+            time.sleep(0.2)
+    raise Exception(f"Whisper 서버에 연결할 수 없습니다: {socket_path}")
+
+
+# 서버는 다른 작업 디렉터리에서 실행될 수 있으므로 경로는 절대 경로로 보냄
+# (파형 배열은 그대로)
+def server_audio(audio):
+    return os.path.abspath(audio) if isinstance(audio, str) else audio
+
+
+# 상주 서버에 전사를 요청 (whisper의 model.transcribe와 같은 결과를 반환)
+# checkpoint=(경로, 키)를 주면 창 단위로 기록하며, 중단되었던 위치부터 이어서 전사합니다.
+def transcribe(audio, model_name="base", checkpoint=None, **options):
+    if checkpoint:
+        checkpoint = (os.path.abspath(checkpoint[0]), checkpoint[1])
+    with connect() as conn:
+        conn.send(
+            {
+                "audio": server_audio(audio),
+                "model": model_name,
+                "checkpoint": checkpoint,
+                "options": options,
+            }
+        )
+        response = conn.recv()
+    if "error" in response:
+        raise Exception(f"Whisper 서버 오류: {response['error']}")
+    return response["result"]
+
+
+# 짧은 오디오 여러 개를 한 번의 요청으로 묶어 전사 (입력 순서대로 결과 목록 반환)
+def transcribe_many(audios, model_name="base", **options):
+    with connect() as conn:
+        conn.send(
+            {
+                "audio": [server_audio(audio) for audio in audios],
+                "model": model_name,
+                "batch": True,
+                "options": options,
+            }
+        )
+        response = conn.recv()
+    if "error" in response:
+        raise Exception(f"Whisper 서버 오류: {response['error']}")
+    return response["result"]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve(sys.argv[1] if len(sys.argv) > 1 else SOCKET_PATH)